@@ -0,0 +1,31 @@
+import numpy
+import pandas
+from pandas import Series
+
+#   Type of the feature matrices that the KNN model is trained and queried with.
+FEATURE_DTYPE: type = numpy.float32
+#   Calendar features, after the contracted power and the weather variables.
+CALENDAR_FEATURES: list = ['hour', 'weekday', 'holiday']
+
+
+def as_datetimes(initial_datetimes: Series) -> numpy.ndarray:
+    #   The datetimes may be read as text or already parsed.
+    if not pandas.api.types.is_datetime64_any_dtype(initial_datetimes):
+        initial_datetimes = pandas.to_datetime(initial_datetimes, format='%Y-%m-%d %H:%M:%S')
+    return initial_datetimes.to_numpy(dtype='datetime64[s]')
+
+
+def build_calendar_features(datetimes: numpy.ndarray, holidays: list = None,
+                            out: numpy.ndarray = None) -> numpy.ndarray:
+    #   The hour of the day with its fraction, the day of the week from Monday as 0, and whether the day is not a
+    #   working day, either a weekend or one of the given holidays.
+    if out is None:
+        out = numpy.empty((len(datetimes), len(CALENDAR_FEATURES)), dtype=FEATURE_DTYPE)
+    days: numpy.ndarray = datetimes.astype('datetime64[D]')
+    out[:, 0] = (datetimes - days) / numpy.timedelta64(1, 'h')
+    #   The 1st of January of 1970 was a Thursday.
+    weekdays: numpy.ndarray = (days.view(numpy.int64) + 3) % 7
+    out[:, 1] = weekdays
+    holiday_days: numpy.ndarray = numpy.array([] if holidays is None else holidays, dtype='datetime64[D]')
+    out[:, 2] = (weekdays >= 5) | numpy.isin(days, holiday_days)
+    return out
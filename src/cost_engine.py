@@ -0,0 +1,52 @@
+import numpy
+
+from src.simulation_clock import SimulationClock
+
+
+class CostBreakdown:
+
+    def __init__(self, purchase_cost: numpy.ndarray, sale_revenue: numpy.ndarray):
+        #   Both arrays have one row per step and one column per point of grid delivery, after any leading candidate
+        #   dimensions. The sale revenue keeps the sign of the flowed energy, so it is negative when energy is sold.
+        self.__purchase_cost: numpy.ndarray = purchase_cost
+        self.__sale_revenue: numpy.ndarray = sale_revenue
+
+    def get_purchase_cost(self) -> numpy.ndarray:
+        return self.__purchase_cost
+
+    def get_sale_revenue(self) -> numpy.ndarray:
+        return self.__sale_revenue
+
+    def get_step_costs(self) -> numpy.ndarray:
+        return (self.__purchase_cost - self.__sale_revenue).sum(axis=-1)
+
+    def get_total(self):
+        return self.get_step_costs().sum(axis=-1)
+
+
+class CostEngine:
+
+    def __init__(self, clock: SimulationClock, pods: list):
+        self.__time_lapse: float = clock.get_time_lapse()
+        #   The prices are aligned with the steps once, taking the first price of every datetime as the points of
+        #   grid delivery do.
+        timestamps: numpy.ndarray = clock.get_timestamps()[:-1]
+        self.__purchase_prices: numpy.ndarray = numpy.column_stack(
+            [pod.get_purchase_prices_series().align(timestamps) for pod in pods]).reshape(len(timestamps), len(pods))
+        self.__sale_prices: numpy.ndarray = numpy.array([pod.get_sale_price().value for pod in pods],
+                                                        dtype=numpy.float64)
+
+    def get_purchase_prices(self) -> numpy.ndarray:
+        return self.__purchase_prices
+
+    def get_sale_prices(self) -> numpy.ndarray:
+        return self.__sale_prices
+
+    def calculate(self, pods_power: numpy.ndarray) -> CostBreakdown:
+        #   The power flowed by the points of grid delivery has one row per step and one column per point, and may
+        #   have leading dimensions to cost several candidates at once.
+        consumption: numpy.ndarray = numpy.asarray(pods_power, dtype=numpy.float64) * self.__time_lapse
+        purchasing: numpy.ndarray = consumption >= 0.0
+        purchase_cost: numpy.ndarray = numpy.where(purchasing, consumption * self.__purchase_prices, 0.0)
+        sale_revenue: numpy.ndarray = numpy.where(purchasing, 0.0, consumption * self.__sale_prices)
+        return CostBreakdown(purchase_cost, sale_revenue)
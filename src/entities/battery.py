@@ -1,8 +1,13 @@
-import pandas
+import copy
+
+import numpy
 from pandas import DataFrame
 
 from src.measurement import Measurement
 from src.entities.entity import Entity
+from src.entities.ledger import Ledger
+from src.entities.battery_fleet import BatteryFleet
+from src.simulation_clock import SimulationClock
 
 
 class Battery(Entity):
@@ -15,10 +20,21 @@ class Battery(Entity):
         self.__max_input_power: Measurement = max_input_power
         self.__max_output_power: Measurement = max_output_power
         self.energy: Measurement = energy if energy is not None else Measurement(0.0, nominal_energy.units)
-        self.flowed_power: DataFrame = DataFrame(columns=['InitialDatetime', 'FinalDatetime', 'Magnitude',
-                                                          'MagnitudeValue', 'MagnitudeUnits'])
-        self.stored_energy: DataFrame = DataFrame(columns=['InitialDatetime', 'FinalDatetime', 'Magnitude',
-                                                           'MagnitudeValue', 'MagnitudeUnits'])
+        self.__initial_energy: Measurement = Measurement(self.energy.value, self.energy.units)
+        self.__flowed_power: Ledger = Ledger('power', max_input_power.units)
+        self.__stored_energy: Ledger = Ledger('energy', 'kWh')
+        self.__fleet: BatteryFleet = None
+        self.__fleet_index: int = -1
+
+    @property
+    def flowed_power(self) -> DataFrame:
+        return self.__flowed_power.to_dataframe(self._clock.get_initial_datetimes(),
+                                                self._clock.get_final_datetimes())
+
+    @property
+    def stored_energy(self) -> DataFrame:
+        return self.__stored_energy.to_dataframe(self._clock.get_initial_datetimes(),
+                                                 self._clock.get_final_datetimes())
 
     def get_nominal_energy(self) -> Measurement:
         return self.__nominal_energy
@@ -29,59 +45,83 @@ class Battery(Entity):
     def get_max_output_power(self) -> Measurement:
         return self.__max_output_power
 
+    def get_flowed_power(self, step: int) -> Measurement:
+        return Measurement(self.__flowed_power.get_value(step), self.__flowed_power.get_units())
+
+    def get_stored_energy(self, step: int) -> Measurement:
+        return Measurement(self.__stored_energy.get_value(step), self.__stored_energy.get_units())
+
+    def get_flowed_power_values(self, steps: int) -> numpy.ndarray:
+        return self.__flowed_power.get_values(steps)
+
+    def get_stored_energy_values(self, steps: int) -> numpy.ndarray:
+        return self.__stored_energy.get_values(steps)
+
+    def get_fleet_index(self) -> int:
+        return self.__fleet_index
+
+    def set_fleet(self, fleet: BatteryFleet, index: int):
+        self.__fleet = fleet
+        self.__fleet_index = index
+
+    def set_clock(self, clock: SimulationClock):
+        super().set_clock(clock)
+        self.__flowed_power.reserve(len(clock))
+        self.__stored_energy.reserve(len(clock))
+
+    def clone(self) -> 'Battery':
+        #   The clone belongs to the fleet of its own entities manager, so it never updates the fleet of the original.
+        battery: Battery = copy.copy(self)
+        battery.__fleet = None
+        battery.reset()
+        return battery
+
+    def reset(self):
+        capacity: int = len(self._clock) if self._clock is not None else 96
+        self.energy = Measurement(self.__initial_energy.value, self.__initial_energy.units)
+        self.__flowed_power = Ledger('power', self.__max_input_power.units, capacity)
+        self.__stored_energy = Ledger('energy', 'kWh', capacity)
+        self.__update_fleet()
+        return
+
     def available_power(self) -> Measurement:
         stored_power: float = self.energy.value / 0.25
         max_output_power: float = self.__max_input_power.value
         return Measurement(min([stored_power, max_output_power]), self.__max_input_power.units)
 
-    def charge(self, initial_datetime: str, final_datetime: str, power: Measurement) -> Measurement:
+    def charge(self, step: int, power: Measurement) -> Measurement:
         stored_power: float = self.energy.value / 0.25
         vacant_power: float = self.__nominal_energy.value / 0.25 - stored_power
         max_input_power: float = self.__max_input_power.value
-        charged_power: Measurement = Measurement(min([vacant_power, max_input_power]), power.units)
-        self.update_flowed_power(initial_datetime, final_datetime, charged_power)
+        charged_power: Measurement = Measurement(min([vacant_power, max_input_power, power.value]), power.units)
+        self.update_flowed_power(step, charged_power)
         return charged_power
 
-    def discharge(self, initial_datetime: str, final_datetime: str, power: Measurement) -> Measurement:
+    def discharge(self, step: int, power: Measurement) -> Measurement:
         available_power: Measurement = self.available_power()
         discharged_power: Measurement = Measurement(min([available_power.value, power.value]), power.units)
-        self.update_flowed_power(initial_datetime, final_datetime, Measurement(-discharged_power.value, power.units))
+        self.update_flowed_power(step, Measurement(-discharged_power.value, power.units))
         return discharged_power
 
-    def update_flowed_power(self, initial_datetime: str, final_datetime: str, power: Measurement):
-        if initial_datetime in list(self.flowed_power['InitialDatetime']):
-            record: int = list(self.flowed_power['InitialDatetime']).index(initial_datetime)
-            self.flowed_power.at[record, 'MagnitudeValue'] += power.value
+    def update_flowed_power(self, step: int, power: Measurement):
+        if self.__flowed_power.is_recorded(step):
+            self.__flowed_power.accumulate(step, power.value)
             return
-        flowing_power: dict = {
-            'InitialDatetime': initial_datetime,
-            'FinalDatetime': final_datetime,
-            'Magnitude': 'power',
-            'MagnitudeValue': power.value,
-            'MagnitudeUnits': power.units
-        }
-        new_record: DataFrame = DataFrame(flowing_power, index=[0])
-        self.flowed_power = pandas.concat([self.flowed_power, new_record])
-        self.flowed_power.reset_index(drop=True, inplace=True)
-        self.__update_stored_energy(initial_datetime, final_datetime, power)
+        self.__flowed_power.accumulate(step, power.value)
+        self.__update_stored_energy(step, power)
         return
 
-    def __update_stored_energy(self, initial_datetime: str, final_datetime: str, power: Measurement):
+    def __update_stored_energy(self, step: int, power: Measurement):
         self.energy.value += power.value * 0.25
-        if initial_datetime in list(self.stored_energy['InitialDatetime']):
-            record: int = list(self.stored_energy['InitialDatetime']).index(initial_datetime)
-            self.stored_energy.at[record, 'MagnitudeValue'] += power.value * 0.25
+        self.__update_fleet()
+        if self.__stored_energy.is_recorded(step):
+            self.__stored_energy.accumulate(step, power.value * 0.25)
             return
-        previous_record: float = list(self.stored_energy['MagnitudeValue'])[-1] if list(
-            self.stored_energy['MagnitudeValue']) else 0.0
-        storing_energy: dict = {
-            'InitialDatetime': initial_datetime,
-            'FinalDatetime': final_datetime,
-            'Magnitude': 'energy',
-            'MagnitudeValue': power.value * 0.25 + previous_record,
-            'MagnitudeUnits': 'kWh'
-        }
-        new_record: DataFrame = DataFrame(storing_energy, index=[0])
-        self.stored_energy = pandas.concat([self.stored_energy, new_record])
-        self.stored_energy.reset_index(drop=True, inplace=True)
+        previous_record: float = self.__stored_energy.get_last_value()
+        self.__stored_energy.accumulate(step, power.value * 0.25 + previous_record)
+        return
+
+    def __update_fleet(self):
+        if self.__fleet is not None:
+            self.__fleet.update_energy(self.__fleet_index, self.energy.value)
         return
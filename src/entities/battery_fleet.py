@@ -0,0 +1,63 @@
+import numpy
+
+
+class BatteryFleet:
+
+    def __init__(self, batteries: list):
+        #   The characteristics and the stored energy of every battery as vectors, in the order of the batteries. The
+        #   batteries keep their stored energy in the fleet up to date.
+        self.__batteries: list = batteries
+        self.__nominal_energy: numpy.ndarray = numpy.array(
+            [battery.get_nominal_energy().value for battery in batteries], dtype=numpy.float64)
+        self.__max_input_power: numpy.ndarray = numpy.array(
+            [battery.get_max_input_power().value for battery in batteries], dtype=numpy.float64)
+        self.__max_output_power: numpy.ndarray = numpy.array(
+            [battery.get_max_output_power().value for battery in batteries], dtype=numpy.float64)
+        self.__energy: numpy.ndarray = numpy.array([battery.energy.value for battery in batteries],
+                                                   dtype=numpy.float64)
+        for index, battery in enumerate(batteries):
+            battery.set_fleet(self, index)
+
+    def __len__(self) -> int:
+        return len(self.__batteries)
+
+    def get_batteries(self) -> list:
+        return self.__batteries
+
+    def get_nominal_energy(self) -> numpy.ndarray:
+        return self.__nominal_energy
+
+    def get_max_input_power(self) -> numpy.ndarray:
+        return self.__max_input_power
+
+    def get_max_output_power(self) -> numpy.ndarray:
+        return self.__max_output_power
+
+    def get_energy(self) -> numpy.ndarray:
+        return self.__energy
+
+    def update_energy(self, index: int, energy: float):
+        self.__energy[index] = energy
+
+    def get_available_power(self) -> numpy.ndarray:
+        #   As the batteries do, the power that they can supply is limited by their maximum input power.
+        return numpy.minimum(self.__energy / 0.25, self.__max_input_power)
+
+    def get_headroom(self) -> numpy.ndarray:
+        #   The power that the batteries can charge, limited by their vacant energy and their maximum input power.
+        return numpy.minimum(self.__nominal_energy / 0.25 - self.__energy / 0.25, self.__max_input_power)
+
+    def get_supplying(self) -> numpy.ndarray:
+        return self.get_available_power() > 0.0
+
+    def get_demanding(self) -> numpy.ndarray:
+        return self.__energy < self.__nominal_energy
+
+    def get_indices(self, batteries: list) -> numpy.ndarray:
+        return numpy.array([battery.get_fleet_index() for battery in batteries], dtype=numpy.int64)
+
+    def select(self, mask: numpy.ndarray, batteries: list = None) -> list:
+        #   The batteries of the mask, either among the whole fleet or among the given ones, keeping their order.
+        if batteries is None or batteries is self.__batteries:
+            return [self.__batteries[index] for index in numpy.flatnonzero(mask)]
+        return [battery for battery in batteries if mask[battery.get_fleet_index()]]
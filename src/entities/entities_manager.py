@@ -1,53 +1,76 @@
+import copy
+
 from pandas import DataFrame
 
 from src.measurement import Measurement
 from src.entities.battery import Battery
+from src.entities.battery_fleet import BatteryFleet
 from src.entities.photovoltaic_plate import PhotovoltaicPlate
 from src.entities.point_of_grid_delivery import PointOfGridDelivery
 from src.entities.point_of_consumption import PointOfConsumption
+from src.simulation_clock import SimulationClock
 
 
 class EntitiesManager:
 
     def __init__(self, entities_info: DataFrame):
         self.__entities: list = self.__load(entities_info)
+        self.__registries: dict = None
+        self.__battery_fleet: BatteryFleet = None
+        self.__register()
 
     def get_entities(self) -> list:
         return self.__entities
 
+    def set_clock(self, clock: SimulationClock):
+        [entity.set_clock(clock) for entity in self.__entities]
+
+    def clone(self) -> 'EntitiesManager':
+        #   The clones of a fully initialised manager share its input series, so they are ready to simulate without
+        #   parsing the characteristics or updating the series again.
+        entities_manager: EntitiesManager = copy.copy(self)
+        entities_manager.__entities = [entity.clone() for entity in self.__entities]
+        entities_manager.__register()
+        return entities_manager
+
+    def reset(self):
+        #   Restore the initial state of the batteries and remove the flows of the previous simulation.
+        [entity.reset() for entity in self.__entities]
+
+    def get_battery_fleet(self) -> BatteryFleet:
+        return self.__battery_fleet
+
     def get_batteries(self) -> list:
-        return list(filter(lambda x: type(x) == Battery, self.__entities))
+        return self.__registries[Battery]
 
     def get_photovoltaic_plates(self) -> list:
-        return list(filter(lambda x: type(x) == PhotovoltaicPlate, self.__entities))
+        return self.__registries[PhotovoltaicPlate]
 
     def get_points_of_grid_delivery(self) -> list:
-        return list(filter(lambda x: type(x) == PointOfGridDelivery, self.__entities))
+        return self.__registries[PointOfGridDelivery]
 
     def get_points_of_consumption(self) -> list:
-        return list(filter(lambda x: type(x) == PointOfConsumption, self.__entities))
-
-    def get_supplying_batteries(self, batteries: list) -> list:
-        supplying_batteries: list = []
-        for battery in batteries:
-            if self.__is_supplying_battery(battery):
-                supplying_batteries.append(battery)
-        return supplying_batteries
-
-    def get_demanding_batteries(self, batteries: list) -> list:
-        demanding_batteries: list = []
-        for battery in batteries:
-            if self.__is_demanding_battery(battery):
-                demanding_batteries.append(battery)
-        return demanding_batteries
-
-    def get_supplying_pods(self, pods: list, initial_datetime: str) -> list:
+        return self.__registries[PointOfConsumption]
+
+    def get_supplying_batteries(self, batteries: list = None) -> list:
+        return self.__battery_fleet.select(self.__battery_fleet.get_supplying(), batteries)
+
+    def get_demanding_batteries(self, batteries: list = None) -> list:
+        return self.__battery_fleet.select(self.__battery_fleet.get_demanding(), batteries)
+
+    def get_supplying_pods(self, pods: list, step: int) -> list:
         supplying_pods: list = []
         for pod in pods:
-            if self.__is_supplying_pod(pod, initial_datetime):
+            if self.__is_supplying_pod(pod, step):
                 supplying_pods.append(pod)
         return supplying_pods
 
+    def __register(self):
+        #   The entities of every type are listed once, and the batteries are also kept as a structure of arrays.
+        self.__registries = {entity_type: [entity for entity in self.__entities if type(entity) == entity_type]
+                             for entity_type in [Battery, PhotovoltaicPlate, PointOfGridDelivery, PointOfConsumption]}
+        self.__battery_fleet = BatteryFleet(self.__registries[Battery])
+
     def __load(self, entities_info: DataFrame) -> list:
         batteries: list = self.__set_batteries(entities_info)
         pvs: list = self.__set_photovoltaic_plates(entities_info)
@@ -115,20 +138,8 @@ class EntitiesManager:
             pocs.append(poc)
         return pocs
 
-    def __is_supplying_battery(self, battery: Battery) -> bool:
-        available_power: Measurement = battery.available_power()
-        if available_power.value > 0.0:
-            return True
-        return False
-
-    def __is_demanding_battery(self, battery: Battery) -> bool:
-        stored_energy: Measurement = battery.energy
-        if stored_energy.value < battery.get_nominal_energy().value:
-            return True
-        return False
-
-    def __is_supplying_pod(self, pod: PointOfGridDelivery, initial_datetime: str) -> bool:
-        available_power: Measurement = pod.available_power(initial_datetime)
+    def __is_supplying_pod(self, pod: PointOfGridDelivery, step: int) -> bool:
+        available_power: Measurement = pod.available_power(step)
         if available_power.value > 0.0:
             return True
         return False
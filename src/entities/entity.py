@@ -1,8 +1,35 @@
+import copy
+
+import numpy
+
+from src.entities.time_series import TimeSeries
+from src.simulation_clock import SimulationClock
+
 
 class Entity:
 
     def __init__(self, entity_id: str):
         self.__id: str = entity_id
+        self._clock: SimulationClock = None
 
     def get_id(self) -> str:
         return self.__id
+
+    def set_clock(self, clock: SimulationClock):
+        self._clock = clock
+
+    def _index_steps(self, series: TimeSeries) -> numpy.ndarray:
+        #   The position in the series of every step of the clock, including the boundary after the last step, so the
+        #   getters read the values by step without formatting any datetime.
+        if series is None or self._clock is None:
+            return None
+        return series.get_positions(self._clock.get_timestamps())
+
+    def clone(self) -> 'Entity':
+        #   The clones share the static characteristics and series, and only get their own simulation state.
+        entity: Entity = copy.copy(self)
+        entity.reset()
+        return entity
+
+    def reset(self):
+        return
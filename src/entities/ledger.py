@@ -0,0 +1,72 @@
+import numpy
+from pandas import DataFrame
+
+
+class Ledger:
+
+    def __init__(self, magnitude: str, units: str, capacity: int = 96):
+        self.__magnitude: str = magnitude
+        self.__units: str = units
+        self.__values: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.float64)
+        self.__recorded: numpy.ndarray = numpy.zeros(capacity, dtype=bool)
+        self.__last_step: int = -1
+
+    def __len__(self) -> int:
+        return int(numpy.count_nonzero(self.__recorded))
+
+    def get_magnitude(self) -> str:
+        return self.__magnitude
+
+    def get_units(self) -> str:
+        return self.__units
+
+    def is_recorded(self, step: int) -> bool:
+        return step < len(self.__recorded) and bool(self.__recorded[step])
+
+    def get_value(self, step: int) -> float:
+        if step >= len(self.__values):
+            return 0.0
+        return float(self.__values[step])
+
+    def get_last_value(self) -> float:
+        if self.__last_step < 0:
+            return 0.0
+        return float(self.__values[self.__last_step])
+
+    def get_values(self, steps: int = None) -> numpy.ndarray:
+        if steps is None:
+            return self.__values
+        #   The steps beyond the preallocated arrays have not been recorded yet.
+        values: numpy.ndarray = numpy.zeros(steps, dtype=numpy.float64)
+        values[:min(steps, len(self.__values))] = self.__values[:steps]
+        return values
+
+    def accumulate(self, step: int, value: float):
+        if step >= len(self.__values):
+            #   Double the preallocated arrays when they are full, so appending stays amortized O(1).
+            self.reserve(max(2 * len(self.__values), step + 1))
+        self.__values[step] += value
+        self.__recorded[step] = True
+        self.__last_step = step
+        return
+
+    def reserve(self, capacity: int):
+        if capacity <= len(self.__values):
+            return
+        values: numpy.ndarray = numpy.zeros(capacity, dtype=numpy.float64)
+        values[:len(self.__values)] = self.__values
+        recorded: numpy.ndarray = numpy.zeros(capacity, dtype=bool)
+        recorded[:len(self.__recorded)] = self.__recorded
+        self.__values = values
+        self.__recorded = recorded
+        return
+
+    def to_dataframe(self, initial_datetimes: list, final_datetimes: list) -> DataFrame:
+        steps: numpy.ndarray = numpy.flatnonzero(self.__recorded)
+        return DataFrame({
+            'InitialDatetime': [initial_datetimes[step] for step in steps],
+            'FinalDatetime': [final_datetimes[step] for step in steps],
+            'Magnitude': self.__magnitude,
+            'MagnitudeValue': self.__values[steps],
+            'MagnitudeUnits': self.__units
+        }, columns=['InitialDatetime', 'FinalDatetime', 'Magnitude', 'MagnitudeValue', 'MagnitudeUnits'])
@@ -1,7 +1,11 @@
+import numpy
 from pandas import DataFrame
 
 from src.measurement import Measurement
 from src.entities.entity import Entity
+from src.entities.ledger import Ledger
+from src.entities.time_series import TimeSeries
+from src.simulation_clock import SimulationClock
 
 
 class PhotovoltaicPlate(Entity):
@@ -12,7 +16,10 @@ class PhotovoltaicPlate(Entity):
         self.__surface: Measurement = surface
         self.__efficiency: Measurement = efficiency
         self.__max_output_power: Measurement = max_output_power
-        self.__generation: DataFrame = None
+        self.__generation: TimeSeries = None
+        self.__generation_steps: numpy.ndarray = None
+        #   The generation that a policy could not deliver to the batteries or the points of grid delivery.
+        self.__curtailed_power: Ledger = Ledger('power', max_output_power.units)
 
     def get_surface(self) -> Measurement:
         return self.__surface
@@ -23,12 +30,34 @@ class PhotovoltaicPlate(Entity):
     def get_max_output_power(self) -> Measurement:
         return self.__max_output_power
 
-    def get_generation(self, initial_datetime: str) -> Measurement:
-        generation: DataFrame = self.__generation[self.__generation['InitialDatetime'] == initial_datetime]
-        return Measurement(list(generation['MagnitudeValue'])[0], list(generation['MagnitudeUnits'])[0])
+    def get_generation(self, step: int) -> Measurement:
+        return self.__generation.get_measurement(self.__generation_steps[step])
+
+    def get_generation_values(self, steps: int) -> numpy.ndarray:
+        return self.__generation.take(self.__generation_steps[:steps])
+
+    def get_curtailed_power(self, step: int) -> Measurement:
+        return Measurement(self.__curtailed_power.get_value(step), self.__curtailed_power.get_units())
+
+    def get_curtailed_power_values(self, steps: int) -> numpy.ndarray:
+        return self.__curtailed_power.get_values(steps)
 
     def get_all_generation(self) -> DataFrame:
-        return self.__generation
+        return self.__generation.get_dataframe() if self.__generation is not None else None
+
+    def set_clock(self, clock: SimulationClock):
+        super().set_clock(clock)
+        self.__generation_steps = self._index_steps(self.__generation)
+        self.__curtailed_power.reserve(len(clock))
+
+    def reset(self):
+        capacity: int = len(self._clock) if self._clock is not None else 96
+        self.__curtailed_power = Ledger('power', self.__max_output_power.units, capacity)
+        return
+
+    def curtail(self, step: int, power: Measurement):
+        self.__curtailed_power.accumulate(step, power.value)
+        return
 
     def update_generation(self, meteo_info: DataFrame):
         generation: DataFrame = DataFrame()
@@ -42,5 +71,6 @@ class PhotovoltaicPlate(Entity):
                                      self.__efficiency.value / 100)
         generation['MagnitudeValue'] = generation_values
         generation['MagnitudeUnits'] = 'kW'
-        self.__generation = generation
+        self.__generation = TimeSeries(generation)
+        self.__generation_steps = self._index_steps(self.__generation)
         return
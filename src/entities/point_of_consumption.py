@@ -1,7 +1,10 @@
+import numpy
 from pandas import DataFrame
 
 from src.entities.entity import Entity
+from src.entities.time_series import TimeSeries
 from src.measurement import Measurement
+from src.simulation_clock import SimulationClock
 
 
 class PointOfConsumption(Entity):
@@ -9,15 +12,23 @@ class PointOfConsumption(Entity):
     def __init__(self, poc_id: str):
         super().__init__(poc_id)
         self.id: str = poc_id
-        self.__consumption: DataFrame = None
+        self.__consumption: TimeSeries = None
+        self.__consumption_steps: numpy.ndarray = None
 
-    def get_consumption(self, initial_datetime: str) -> Measurement:
-        consumption: DataFrame = self.__consumption[self.__consumption['InitialDatetime'] == initial_datetime]
-        return Measurement(list(consumption['MagnitudeValue'])[0], list(consumption['MagnitudeUnits'])[0])
+    def get_consumption(self, step: int) -> Measurement:
+        return self.__consumption.get_measurement(self.__consumption_steps[step])
+
+    def get_consumption_values(self, steps: int) -> numpy.ndarray:
+        return self.__consumption.take(self.__consumption_steps[:steps])
 
     def get_all_consumption(self) -> DataFrame:
-        return self.__consumption
+        return self.__consumption.get_dataframe() if self.__consumption is not None else None
+
+    def set_clock(self, clock: SimulationClock):
+        super().set_clock(clock)
+        self.__consumption_steps = self._index_steps(self.__consumption)
 
     def update_consumption(self, consumption: DataFrame):
-        self.__consumption = consumption
+        self.__consumption = TimeSeries(consumption)
+        self.__consumption_steps = self._index_steps(self.__consumption)
         return
@@ -1,8 +1,11 @@
-import pandas
+import numpy
 from pandas import DataFrame
 
 from src.measurement import Measurement
 from src.entities.entity import Entity
+from src.entities.ledger import Ledger
+from src.entities.time_series import TimeSeries
+from src.simulation_clock import SimulationClock
 
 
 class PointOfGridDelivery(Entity):
@@ -11,74 +14,88 @@ class PointOfGridDelivery(Entity):
         super().__init__(pod_id)
         self.id: str = pod_id
         self.__max_input_power: Measurement = max_input_power
-        self.__max_output_power: DataFrame = None
-        self.__purchase_prices: DataFrame = None
+        self.__max_output_power: TimeSeries = None
+        self.__purchase_prices: TimeSeries = None
+        self.__max_output_power_steps: numpy.ndarray = None
+        self.__purchase_prices_steps: numpy.ndarray = None
         self.__sale_price: Measurement = None
-        self.flowed_power: DataFrame = DataFrame(columns=['InitialDatetime', 'FinalDatetime', 'Magnitude',
-                                                          'MagnitudeValue', 'MagnitudeUnits'])
+        self.__flowed_power: Ledger = Ledger('power', max_input_power.units)
+
+    @property
+    def flowed_power(self) -> DataFrame:
+        return self.__flowed_power.to_dataframe(self._clock.get_initial_datetimes(),
+                                                self._clock.get_final_datetimes())
 
     def get_max_output_power(self) -> DataFrame:
-        return self.__max_output_power
+        return self.__max_output_power.get_dataframe() if self.__max_output_power is not None else None
 
     def get_max_input_power(self) -> Measurement:
         return self.__max_input_power
 
-    def get_purchase_price(self, initial_datetime: str) -> Measurement:
-        purchase_prices: DataFrame = self.__purchase_prices[
-            self.__purchase_prices['InitialDatetime'] == initial_datetime]
-        return Measurement(list(purchase_prices['MagnitudeValue'])[0], list(purchase_prices['MagnitudeUnits'])[0])
+    def get_purchase_price(self, step: int) -> Measurement:
+        return self.__purchase_prices.get_measurement(self.__purchase_prices_steps[step])
+
+    def get_purchase_price_values(self, steps: int) -> numpy.ndarray:
+        return self.__purchase_prices.take(self.__purchase_prices_steps[:steps])
 
     def get_all_purchase_prices(self) -> DataFrame:
+        return self.__purchase_prices.get_dataframe() if self.__purchase_prices is not None else None
+
+    def get_purchase_prices_series(self) -> TimeSeries:
         return self.__purchase_prices
 
     def get_sale_price(self) -> Measurement:
         return self.__sale_price
 
+    def get_flowed_power(self, step: int) -> Measurement:
+        return Measurement(self.__flowed_power.get_value(step), self.__flowed_power.get_units())
+
+    def get_flowed_power_values(self, steps: int) -> numpy.ndarray:
+        return self.__flowed_power.get_values(steps)
+
+    def set_clock(self, clock: SimulationClock):
+        super().set_clock(clock)
+        self.__max_output_power_steps = self._index_steps(self.__max_output_power)
+        self.__purchase_prices_steps = self._index_steps(self.__purchase_prices)
+        self.__flowed_power.reserve(len(clock))
+
+    def reset(self):
+        capacity: int = len(self._clock) if self._clock is not None else 96
+        self.__flowed_power = Ledger('power', self.__max_input_power.units, capacity)
+        return
+
     def update_max_output_power(self, max_output_power: DataFrame):
-        self.__max_output_power = max_output_power
+        self.__max_output_power = TimeSeries(max_output_power)
+        self.__max_output_power_steps = self._index_steps(self.__max_output_power)
 
     def update_purchase_prices(self, purchase_prices: DataFrame):
-        self.__purchase_prices = purchase_prices
+        self.__purchase_prices = TimeSeries(purchase_prices)
+        self.__purchase_prices_steps = self._index_steps(self.__purchase_prices)
 
     def update_sale_price(self, sale_price: Measurement):
         self.__sale_price = sale_price
 
-    def available_power(self, initial_datetime: str) -> Measurement:
-        max_output_power: DataFrame = self.__max_output_power[
-            self.__max_output_power['InitialDatetime'] == initial_datetime]
-        if not self.flowed_power.empty and initial_datetime in list(self.flowed_power['InitialDatetime']):
-            flowed_power: float = list(
-                self.flowed_power[self.flowed_power['InitialDatetime'] == initial_datetime]['MagnitudeValue'])[0]
-        else:
-            flowed_power: float = 0.0
-        return Measurement(list(max_output_power['MagnitudeValue'])[0] - flowed_power,
-                           list(max_output_power['MagnitudeUnits'])[0])
-
-    def supply_power(self, initial_datetime: str, final_datetime: str, power: Measurement) -> Measurement:
-        max_output_power: Measurement = self.available_power(initial_datetime)
+    def available_power(self, step: int) -> Measurement:
+        max_output_power: Measurement = self.__max_output_power.get_measurement(self.__max_output_power_steps[step])
+        flowed_power: float = self.__flowed_power.get_value(step)
+        return Measurement(max_output_power.value - flowed_power, max_output_power.units)
+
+    def available_power_values(self, steps: int) -> numpy.ndarray:
+        return self.__max_output_power.take(self.__max_output_power_steps[:steps]) - \
+            self.__flowed_power.get_values(steps)
+
+    def supply_power(self, step: int, power: Measurement) -> Measurement:
+        max_output_power: Measurement = self.available_power(step)
         supplied_power: Measurement = Measurement(min([max_output_power.value, power.value]), power.units)
-        self.update_flowed_power(initial_datetime, final_datetime, supplied_power)
+        self.update_flowed_power(step, supplied_power)
         return supplied_power
 
-    def receive_power(self, initial_datetime: str, final_datetime: str, power: Measurement) -> Measurement:
+    def receive_power(self, step: int, power: Measurement) -> Measurement:
         max_input_power: float = self.__max_input_power.value
         received_power: Measurement = Measurement(min([max_input_power, power.value]), power.units)
-        self.update_flowed_power(initial_datetime, final_datetime, Measurement(-received_power.value, power.units))
+        self.update_flowed_power(step, Measurement(-received_power.value, power.units))
         return received_power
 
-    def update_flowed_power(self, initial_datetime: str, final_datetime: str, power: Measurement):
-        if initial_datetime in list(self.flowed_power['InitialDatetime']):
-            record: int = list(self.flowed_power['InitialDatetime']).index(initial_datetime)
-            self.flowed_power.at[record, 'MagnitudeValue'] += power.value
-            return
-        flowing_power: dict = {
-            'InitialDatetime': initial_datetime,
-            'FinalDatetime': final_datetime,
-            'Magnitude': 'power',
-            'MagnitudeValue': power.value,
-            'MagnitudeUnits': power.units
-        }
-        new_record: DataFrame = DataFrame(flowing_power, index=[0])
-        self.flowed_power = pandas.concat([self.flowed_power, new_record])
-        self.flowed_power.reset_index(drop=True, inplace=True)
+    def update_flowed_power(self, step: int, power: Measurement):
+        self.__flowed_power.accumulate(step, power.value)
         return
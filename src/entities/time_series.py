@@ -0,0 +1,70 @@
+import numpy
+import pandas
+from pandas import DataFrame, Index
+
+from src.measurement import Measurement
+
+
+class TimeSeries:
+
+    def __init__(self, dataframe: DataFrame):
+        #   The series is owned by the entity that receives it, and the clones of the entity share it. The values are
+        #   read when the series is built, so a DataFrame modified afterwards has to be given to the entity again.
+        self.__dataframe: DataFrame = dataframe
+        self.__values: numpy.ndarray = dataframe['MagnitudeValue'].to_numpy(dtype=numpy.float64)
+        self.__units: numpy.ndarray = dataframe['MagnitudeUnits'].to_numpy(dtype=object)
+        self.__datetimes: numpy.ndarray = self.to_timestamps(dataframe['InitialDatetime'])
+        #   The first record of every datetime is the one that is read, as with the previous DataFrame filters, so the
+        #   index only keeps the position of that first record.
+        first: numpy.ndarray = ~Index(self.__datetimes).duplicated(keep='first')
+        self.__index: Index = Index(self.__datetimes[first])
+        self.__positions: numpy.ndarray = numpy.flatnonzero(first)
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    @staticmethod
+    def to_timestamps(datetimes) -> numpy.ndarray:
+        #   The texts of the inputs and the timestamps of the clock are compared as native nanosecond datetimes.
+        return pandas.to_datetime(pandas.Series(datetimes), format='%Y-%m-%d %H:%M:%S').to_numpy(
+            dtype='datetime64[ns]')
+
+    def get_dataframe(self) -> DataFrame:
+        return self.__dataframe
+
+    def get_values(self) -> numpy.ndarray:
+        return self.__values
+
+    def get_datetimes(self) -> numpy.ndarray:
+        return self.__datetimes
+
+    def get_position(self, timestamp) -> int:
+        return int(self.__positions[self.__index.get_loc(pandas.Timestamp(timestamp))])
+
+    def get_positions(self, timestamps) -> numpy.ndarray:
+        #   The position of the record of every timestamp, with -1 for the ones that are not in the series.
+        found: numpy.ndarray = self.__index.get_indexer(self.to_timestamps(timestamps))
+        return numpy.where(found >= 0, self.__positions[found], -1)
+
+    def get_value(self, position: int) -> float:
+        if position < 0:
+            raise KeyError('The series has no record for the requested datetime')
+        return float(self.__values[position])
+
+    def get_measurement(self, position: int) -> Measurement:
+        if position < 0:
+            raise KeyError('The series has no record for the requested datetime')
+        return Measurement(float(self.__values[position]), self.__units[position])
+
+    def take(self, positions: numpy.ndarray) -> numpy.ndarray:
+        #   The values of the given positions, which have to be in the series as with the single lookups.
+        if numpy.any(positions < 0):
+            raise KeyError('The series has no record for some of the requested datetimes')
+        return self.__values[positions]
+
+    def align(self, timestamps) -> numpy.ndarray:
+        #   The values of the given timestamps, with NaN for the ones that are not in the series.
+        positions: numpy.ndarray = self.get_positions(timestamps)
+        if len(self.__values) == 0:
+            return numpy.full(len(positions), numpy.nan)
+        return numpy.where(positions >= 0, self.__values[positions], numpy.nan)
@@ -0,0 +1,19 @@
+import os
+
+from pandas import DataFrame
+
+from src.fleet_runner import FleetRunner
+
+__parent_path: str = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir))
+#   Manifest with the input files of every site.
+__fleet_manifest: str = os.path.join(__parent_path, 'data', 'input', 'fleet_manifest.csv')
+#   Output path of the progress log, the result store and the simulations of every site.
+__fleet_output_path: str = os.path.join(__parent_path, 'data', 'output', 'fleet')
+
+#   Simulate every site of the manifest in its own process. An interrupted run resumes after the sites already
+#   recorded in the progress log.
+
+fleet_runner: FleetRunner = FleetRunner(__fleet_manifest, __fleet_output_path, workers=os.cpu_count())
+fleet_results: DataFrame = fleet_runner.run()
+
+print(fleet_results[['Status', 'StandardCost', 'OptimizedCost', 'TotalTime']])
@@ -0,0 +1,211 @@
+import os
+import json
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas
+from pandas import DataFrame
+
+from src.measurement import Measurement
+from src.simulation_result import SimulationResult
+from src.site_pipeline import SitePipeline, SITE_INPUTS, STAGES
+
+#   Sale price of the sites whose manifest row does not set one, in €/kWh.
+DEFAULT_SALE_PRICE: float = 0.13
+
+
+def read_manifest(manifest_path: str) -> DataFrame:
+    #   One row per site, indexed by its identifier, with the absolute paths of its input files.
+    manifest: DataFrame = pandas.read_csv(manifest_path, sep=';', dtype={'SiteId': str})
+    missing: list = [column for column in ['SiteId'] + SITE_INPUTS if column not in manifest.columns]
+    if missing:
+        raise ValueError('The manifest has no columns: ' + ', '.join(missing))
+    if manifest['SiteId'].duplicated().any():
+        raise ValueError('The manifest has repeated sites: ' +
+                         ', '.join(manifest.loc[manifest['SiteId'].duplicated(), 'SiteId']))
+    manifest_directory: str = os.path.dirname(os.path.abspath(manifest_path))
+    for column in SITE_INPUTS:
+        manifest[column] = [os.path.normpath(os.path.join(manifest_directory, path)) for path in manifest[column]]
+    if 'SalePrice' not in manifest.columns:
+        manifest['SalePrice'] = DEFAULT_SALE_PRICE
+    manifest['SalePrice'] = manifest['SalePrice'].fillna(DEFAULT_SALE_PRICE)
+    return manifest.set_index('SiteId', drop=False)
+
+
+def simulate_site(site: dict, site_path: str, search_workers: int = 1) -> dict:
+    #   Train, forecast, simulate and cost the standard and the optimized policies of one site with the pipeline of
+    #   the main script. The caches and the simulations of the site are kept in its own directory. The sites already
+    #   run in parallel, so the model does not start its own threads.
+    site_pipeline: SitePipeline = SitePipeline({column: site[column] for column in SITE_INPUTS},
+                                               os.path.join(site_path, 'cache'),
+                                               Measurement(float(site['SalePrice']), '€/kWh'),
+                                               search_workers=search_workers, n_jobs=1)
+    site_pipeline.train()
+    site_pipeline.forecast()
+    standard_result: SimulationResult = site_pipeline.simulate_standard()
+    optimized_coefficients: dict = site_pipeline.search()
+    optimized_result: SimulationResult = site_pipeline.simulate_optimized(optimized_coefficients)
+
+    costs: dict = {}
+    for policy, result in [('Standard', standard_result), ('Optimized', optimized_result)]:
+        result.to_csv(os.path.join(site_path, policy.lower() + '_simulation.csv'))
+        costs[policy + 'Cost'] = site_pipeline.calculate_cost(result).value
+
+    times: dict = site_pipeline.get_times()
+    return {**costs, 'Coefficients': optimized_coefficients,
+            **{stage + 'Time': round(times[stage], 4) for stage in STAGES}}
+
+
+def _run_site(site: dict, site_path: str, search_workers: int) -> dict:
+    #   The errors of a site are recorded in its log entry, so they never stop the rest of the fleet.
+    start: float = time.perf_counter()
+    try:
+        os.makedirs(site_path, exist_ok=True)
+        record: dict = {'Status': 'done', **simulate_site(site, site_path, search_workers)}
+    except Exception as error:
+        record: dict = {'Status': 'failed', 'Error': type(error).__name__ + ': ' + str(error),
+                        'Traceback': traceback.format_exc()}
+    record['TotalTime'] = round(time.perf_counter() - start, 4)
+    record['Worker'] = os.getpid()
+    return record
+
+
+class FleetRunner:
+
+    def __init__(self, manifest_path: str, output_path: str, workers: int = 1, search_workers: int = 1,
+                 retry_failed: bool = True):
+        self.__manifest: DataFrame = read_manifest(manifest_path)
+        self.__output_path: str = output_path
+        self.__workers: int = workers
+        #   Processes of the coefficient search of every site, which only pays off with fewer sites than workers.
+        self.__search_workers: int = search_workers
+        #   Whether the sites that failed in a previous run are simulated again when the run is resumed.
+        self.__retry_failed: bool = retry_failed
+        self.__progress_path: str = os.path.join(output_path, 'progress.jsonl')
+        self.__records: dict = {}
+
+    def get_manifest(self) -> DataFrame:
+        return self.__manifest
+
+    def get_records(self) -> dict:
+        #   The last log entry of every site.
+        return self.__records
+
+    def get_site_path(self, site_id: str) -> str:
+        return os.path.join(self.__output_path, 'sites', site_id)
+
+    def run(self) -> DataFrame:
+        #   Simulate the sites that are not finished in the progress log, and aggregate the results of the whole
+        #   fleet in the result store.
+        os.makedirs(self.__output_path, exist_ok=True)
+        self.__records = self.__read_progress()
+        pending: list = [site_id for site_id in self.__manifest.index if not self.__is_finished(site_id)]
+        print('Fleet sites:', len(self.__manifest), 'pending:', len(pending))
+
+        start: float = time.perf_counter()
+        with open(self.__progress_path, 'a') as progress_file:
+            #   A crashed worker breaks the whole pool. The sites that were not started yet go back to a new pool with
+            #   every worker, and only the sites that were in flight are simulated again one by one, so only the site
+            #   that crashes its own worker is recorded as failed.
+            suspects: list = []
+            while pending:
+                pending, crashed = self.__run_pool(pending, self.__workers, progress_file)
+                suspects += crashed
+            for site_id in suspects:
+                if self.__run_pool([site_id], 1, progress_file)[1]:
+                    self.__log(progress_file, site_id, {
+                        'Status': 'failed', 'Error': 'BrokenProcessPool: the worker process terminated abruptly'})
+        print('The fleet has been simulated in:', round(time.perf_counter() - start, 3), 's')
+        return self.build_store()
+
+    def build_store(self) -> DataFrame:
+        #   The costs, statuses and times of every site indexed by its identifier, and the simulations of the finished
+        #   sites indexed by site and policy.
+        results: DataFrame = DataFrame([{'SiteId': site_id, **self.__summarize(self.__records.get(site_id, {}))}
+                                        for site_id in self.__manifest.index]).set_index('SiteId')
+        results.to_csv(os.path.join(self.__output_path, 'fleet_results.csv'), sep=';')
+
+        simulations: list = []
+        for site_id in results.index[results['Status'] == 'done']:
+            for policy in ['Standard', 'Optimized']:
+                simulation: DataFrame = pandas.read_csv(
+                    os.path.join(self.get_site_path(site_id), policy.lower() + '_simulation.csv'), sep=';')
+                simulation.insert(0, 'Policy', policy)
+                simulation.insert(0, 'SiteId', site_id)
+                simulations.append(simulation)
+        if simulations:
+            pandas.concat(simulations, ignore_index=True).set_index(['SiteId', 'Policy']).to_csv(
+                os.path.join(self.__output_path, 'fleet_simulations.csv'), sep=';')
+        return results
+
+    def __run_pool(self, site_ids: list, workers: int, progress_file) -> tuple:
+        #   Keep at most one site in flight per worker, so a crash only catches the sites that were running. Return
+        #   the sites that were not started and the sites whose worker crashed before they were recorded.
+        queue: list = list(site_ids)
+        crashed: list = []
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(queue)))) as executor:
+            futures: dict = {}
+            while queue or futures:
+                while queue and len(futures) < workers:
+                    site_id: str = queue.pop(0)
+                    futures[executor.submit(_run_site, self.__manifest.loc[site_id, :].to_dict(),
+                                            self.get_site_path(site_id), self.__search_workers)] = site_id
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    site_id: str = futures.pop(future)
+                    try:
+                        record: dict = future.result()
+                    except BrokenProcessPool:
+                        crashed.append(site_id)
+                        continue
+                    self.__log(progress_file, site_id, record)
+                if crashed:
+                    #   The sites still in flight either finished before the crash or are lost with the pool.
+                    for future, site_id in futures.items():
+                        if not future.cancelled() and future.exception() is None:
+                            self.__log(progress_file, site_id, future.result())
+                        else:
+                            crashed.append(site_id)
+                    break
+        return queue, crashed
+
+    def __log(self, progress_file, site_id: str, record: dict):
+        #   Every entry is flushed to disk as soon as the site finishes, so an interrupted run resumes after it.
+        record = {'SiteId': site_id, **record}
+        self.__records[site_id] = record
+        progress_file.write(json.dumps(record) + '\n')
+        progress_file.flush()
+        os.fsync(progress_file.fileno())
+        finished: int = sum(self.__is_finished(site) for site in self.__manifest.index)
+        print('Site', site_id, record['Status'], 'in', record.get('TotalTime', 0.0), 's', '(' + str(finished) + '/' +
+              str(len(self.__manifest)) + ')')
+
+    def __read_progress(self) -> dict:
+        #   The last entry of every site wins. A line cut by an interrupted run is ignored.
+        records: dict = {}
+        if os.path.exists(self.__progress_path):
+            with open(self.__progress_path) as progress_file:
+                for line in progress_file:
+                    try:
+                        record: dict = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    records[record['SiteId']] = record
+        return records
+
+    def __is_finished(self, site_id: str) -> bool:
+        #   A finished site whose simulations have been removed is simulated again.
+        status: str = self.__records.get(site_id, {}).get('Status')
+        if status == 'done':
+            return os.path.exists(os.path.join(self.get_site_path(site_id), 'optimized_simulation.csv'))
+        return status == 'failed' and not self.__retry_failed
+
+    def __summarize(self, record: dict) -> dict:
+        summary: dict = {'Status': record.get('Status', 'pending'), 'StandardCost': record.get('StandardCost'),
+                         'OptimizedCost': record.get('OptimizedCost'),
+                         'Coefficients': json.dumps(record['Coefficients']) if 'Coefficients' in record else None}
+        summary.update({stage + 'Time': record.get(stage + 'Time') for stage in STAGES})
+        summary.update({'TotalTime': record.get('TotalTime'), 'Error': record.get('Error')})
+        return summary
@@ -0,0 +1,141 @@
+import os
+import json
+import numpy
+import pandas
+from pandas import DataFrame
+from datetime import datetime
+
+from src.parser import Parser
+from src.input_cache import InputCache
+from src.context_features import FEATURE_DTYPE, CALENDAR_FEATURES, build_calendar_features
+
+
+class TrainingHistory:
+
+    def __init__(self, path: str, rows: int, columns: list):
+        #   The matrices are memory-mapped from the files of the reader, so only the pages in use are kept in memory.
+        self.__columns: list = columns
+        self.__datetimes: numpy.ndarray = self.__open(os.path.join(path, 'datetimes.bin'), 'datetime64[s]', (rows,))
+        self.__context: numpy.ndarray = self.__open(os.path.join(path, 'context.bin'), FEATURE_DTYPE,
+                                                    (rows, len(columns)))
+        self.__consumption: numpy.ndarray = self.__open(os.path.join(path, 'consumption.bin'), numpy.float64, (rows,))
+
+    def __len__(self) -> int:
+        return len(self.__datetimes)
+
+    def get_columns(self) -> list:
+        return self.__columns
+
+    def get_datetimes(self) -> numpy.ndarray:
+        return self.__datetimes
+
+    def get_context(self) -> numpy.ndarray:
+        #   One row per joined datetime and one column per context variable.
+        return self.__context
+
+    def get_consumption(self) -> numpy.ndarray:
+        return self.__consumption
+
+    def get_context_info(self) -> DataFrame:
+        #   The context in the format that the KNN model accepts, without copying the matrix.
+        return DataFrame(self.__context, columns=self.__columns, copy=False)
+
+    def get_consumption_history(self) -> DataFrame:
+        return DataFrame({'InitialDatetime': self.__datetimes, 'MagnitudeValue': self.__consumption}, copy=False)
+
+    def __open(self, path: str, dtype, shape: tuple) -> numpy.ndarray:
+        if shape[0] == 0:
+            return numpy.empty(shape, dtype=dtype)
+        return numpy.memmap(path, dtype=dtype, mode='r', shape=shape)
+
+
+class HistoryReader:
+
+    def __init__(self, parser: Parser, input_cache: InputCache, chunk_size: int = 65536, interpolate: bool = False,
+                 holidays: list = None):
+        self.__parser: Parser = parser
+        #   The joined matrices are entries of the input cache, keyed and validated by the three sources.
+        self.__input_cache: InputCache = input_cache
+        self.__holidays: list = [str(holiday) for holiday in holidays] if holidays is not None else []
+        self.__chunk_size: int = chunk_size
+        self.__interpolate: bool = interpolate
+        #   The repeated hour of the daylight saving time change may come back after the end of a chunk.
+        self.__lookback: numpy.timedelta64 = numpy.timedelta64(1, 'D')
+
+    def read(self, consumption_path: str, contracted_power_path: str, meteo_path: str) -> TrainingHistory:
+        #   Join the consumption, the contracted power and the meteorological histories by datetime, chunk by chunk,
+        #   into the files of a cache entry. The files are reused while the sources do not change.
+        sources: list = [consumption_path, contracted_power_path, meteo_path]
+        output_path, metadata = self.__input_cache.get_entry(sources, 'history|' + json.dumps(
+            {'interpolate': self.__interpolate, 'holidays': self.__holidays}))
+        if metadata is not None:
+            return TrainingHistory(output_path, metadata['rows'], metadata['columns'])
+
+        #   The hourly meteorological values are small enough to be kept in memory.
+        times, weather_values, _ = self.__parser.read_hourly_meteo(meteo_path)
+        weather_variables: list = self.__parser.get_weather_variables()
+        initial_hour: numpy.datetime64 = numpy.datetime64(
+            datetime.strptime(times[0], self.__parser.get_meteo_datetime_format()), 's')
+        hourly_values: numpy.ndarray = numpy.column_stack([weather_values[weather_variable].astype(numpy.float64)
+                                                           for weather_variable in weather_variables])
+
+        self.__input_cache.create_entry(output_path)
+        rows: int = 0
+        with open(os.path.join(output_path, 'datetimes.bin'), 'wb') as datetimes_file, \
+                open(os.path.join(output_path, 'context.bin'), 'wb') as context_file, \
+                open(os.path.join(output_path, 'consumption.bin'), 'wb') as consumption_file:
+            for joined in self.__join(consumption_path, contracted_power_path):
+                datetimes: numpy.ndarray = joined['InitialDatetime'].to_numpy(dtype='datetime64[s]')
+                weather, found = self.__align_weather(datetimes, initial_hour, hourly_values)
+                context: numpy.ndarray = numpy.empty(
+                    (len(weather), len(weather_variables) + len(CALENDAR_FEATURES) + 1), dtype=FEATURE_DTYPE)
+                context[:, 0] = joined['MagnitudeValue_contracted_power'].to_numpy(dtype=numpy.float64)[found]
+                context[:, 1:len(weather_variables) + 1] = weather
+                build_calendar_features(datetimes[found], self.__holidays, context[:, len(weather_variables) + 1:])
+                datetimes[found].view(numpy.int64).tofile(datetimes_file)
+                context.tofile(context_file)
+                joined['MagnitudeValue_consumption'].to_numpy(dtype=numpy.float64)[found].tofile(consumption_file)
+                rows += len(context)
+
+        columns: list = ['contracted_power'] + weather_variables + CALENDAR_FEATURES
+        self.__input_cache.commit_entry(output_path, sources, {'rows': rows, 'columns': columns})
+        return TrainingHistory(output_path, rows, columns)
+
+    def __read_chunks(self, path: str):
+        for chunk in pandas.read_csv(path, sep=';', usecols=['InitialDatetime', 'MagnitudeValue'],
+                                     chunksize=self.__chunk_size):
+            chunk['InitialDatetime'] = pandas.to_datetime(chunk['InitialDatetime'], format='%Y-%m-%d %H:%M:%S')
+            yield chunk
+
+    def __join(self, consumption_path: str, contracted_power_path: str):
+        #   Both files are sorted by datetime, so every chunk of consumption only needs the contracted power read up
+        #   to its last datetime. The first record of every datetime of contracted power is the one joined.
+        contracted_power_chunks = self.__read_chunks(contracted_power_path)
+        pending: DataFrame = None
+        exhausted: bool = False
+        for consumption in self.__read_chunks(consumption_path):
+            last_datetime: numpy.datetime64 = consumption['InitialDatetime'].max()
+            while not exhausted and (pending is None or pending['InitialDatetime'].iloc[-1] < last_datetime):
+                chunk: DataFrame = next(contracted_power_chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    pending = chunk if pending is None else pandas.concat([pending, chunk], ignore_index=True)
+            if pending is None:
+                return
+            yield consumption.merge(pending.drop_duplicates('InitialDatetime'), on='InitialDatetime', how='inner',
+                                    suffixes=('_consumption', '_contracted_power'))
+            pending = pending[pending['InitialDatetime'] > last_datetime - self.__lookback]
+
+    def __align_weather(self, datetimes: numpy.ndarray, initial_hour: numpy.datetime64,
+                        hourly_values: numpy.ndarray) -> tuple:
+        #   Every hourly value covers the four quarters of its hour, as in the meteorological DataFrames of the parser.
+        #   Return the values and whether every datetime is covered by the meteorological history.
+        hours: numpy.ndarray = (datetimes - initial_hour) / numpy.timedelta64(1, 'h')
+        found: numpy.ndarray = (hours >= 0) & (hours < len(hourly_values))
+        hours = hours[found]
+        if self.__interpolate:
+            positions: numpy.ndarray = numpy.arange(len(hourly_values))
+            return numpy.column_stack([numpy.interp(hours, positions, hourly_values[:, column])
+                                       for column in range(hourly_values.shape[1])]), found
+        return hourly_values[hours.astype(numpy.int64)], found
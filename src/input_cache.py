@@ -0,0 +1,148 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy
+import pandas
+from pandas import DataFrame, Series
+
+#   Format of the entries, whose older versions are parsed again.
+ENTRY_VERSION: int = 3
+
+
+class InputCache:
+
+    def __init__(self, cache_path: str, mmap: bool = True):
+        self.__cache_path: str = cache_path
+        self.__mmap: bool = mmap
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    def get_hits(self) -> int:
+        return self.__hits
+
+    def get_misses(self) -> int:
+        return self.__misses
+
+    def read_csv(self, path: str, sep: str = ';') -> DataFrame:
+        return self.load(path, lambda source_path: self.__parse_csv(source_path, sep), 'csv' + sep)
+
+    def load(self, path: str, reader, variant: str = '') -> DataFrame:
+        #   The parsed frame of the source, read by the reader only when the entry is not valid.
+        entry_path, metadata = self.get_entry([path], 'frame|' + variant)
+        if metadata is not None:
+            return self.__read_entry(entry_path, metadata)
+        dataframe: DataFrame = reader(path)
+        self.create_entry(entry_path)
+        self.commit_entry(entry_path, [path], self.__write_entry(entry_path, dataframe))
+        return dataframe
+
+    def get_entry(self, paths: list, variant: str = '') -> tuple:
+        #   The entries are keyed by the source paths and the reader variant, and are valid while the size and the
+        #   modification time of every source match. A touched file with the same content is revalidated by its hash.
+        #   Return the path of the entry and its metadata, which is None when the entry has to be built again.
+        paths = [os.path.abspath(path) for path in paths]
+        entry_path: str = os.path.join(self.__cache_path,
+                                       hashlib.sha1(('|'.join(paths) + '|' + variant).encode('utf-8')).hexdigest())
+        statuses: list = [os.stat(path) for path in paths]
+        metadata: dict = self.__read_metadata(entry_path)
+        if metadata is None or metadata.get('version') != ENTRY_VERSION or \
+                [source['path'] for source in metadata['sources']] != paths or \
+                any(source['size'] != status.st_size for source, status in zip(metadata['sources'], statuses)):
+            self.__misses += 1
+            return entry_path, None
+        touched: list = [(source, status) for source, status in zip(metadata['sources'], statuses)
+                         if source['mtime'] != status.st_mtime_ns]
+        if any(source['hash'] != self.__hash(source['path']) for source, _ in touched):
+            self.__misses += 1
+            return entry_path, None
+        if touched:
+            for source, status in touched:
+                source['mtime'] = status.st_mtime_ns
+            self.__write_metadata(entry_path, metadata)
+        self.__hits += 1
+        return entry_path, metadata
+
+    def create_entry(self, entry_path: str):
+        #   An empty directory for the files of an entry, which stays invalid until it is committed.
+        shutil.rmtree(entry_path, ignore_errors=True)
+        os.makedirs(entry_path)
+
+    def commit_entry(self, entry_path: str, paths: list, metadata: dict):
+        #   The metadata is written last, with the size, the modification time and the hash of every source.
+        sources: list = []
+        for path in paths:
+            status: os.stat_result = os.stat(path)
+            sources.append({'path': os.path.abspath(path), 'size': status.st_size, 'mtime': status.st_mtime_ns,
+                            'hash': self.__hash(path)})
+        self.__write_metadata(entry_path, {**metadata, 'version': ENTRY_VERSION, 'sources': sources})
+
+    def __parse_csv(self, path: str, sep: str) -> DataFrame:
+        dataframe: DataFrame = pandas.read_csv(path, sep=sep)
+        #   The datetimes are kept as native timestamps.
+        for column in dataframe.columns:
+            if column.endswith('Datetime'):
+                dataframe[column] = pandas.to_datetime(dataframe[column], format='%Y-%m-%d %H:%M:%S')
+        return dataframe
+
+    def __hash(self, path: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def __read_metadata(self, entry_path: str) -> dict:
+        try:
+            with open(os.path.join(entry_path, 'metadata.json')) as metadata_file:
+                return json.load(metadata_file)
+        except (OSError, ValueError):
+            return None
+
+    def __write_metadata(self, entry_path: str, metadata: dict):
+        #   The metadata is written last and replaced atomically, so an interrupted write leaves the entry invalid.
+        temporary_path: str = os.path.join(entry_path, 'metadata.json.tmp')
+        with open(temporary_path, 'w') as metadata_file:
+            json.dump(metadata, metadata_file)
+        os.replace(temporary_path, os.path.join(entry_path, 'metadata.json'))
+
+    def __read_entry(self, entry_path: str, metadata: dict) -> DataFrame:
+        #   Every column is stored in its own .npy file, so the numeric and datetime columns can be memory-mapped.
+        index = pandas.RangeIndex(*metadata['range_index']) if metadata.get('range_index') is not None else \
+            numpy.load(os.path.join(entry_path, 'index.npy'))
+        columns: dict = {}
+        for position, (column, kind, dtype) in enumerate(metadata['columns']):
+            values: numpy.ndarray = numpy.load(os.path.join(entry_path, str(position) + '.npy'),
+                                               mmap_mode='r' if self.__mmap and kind == 'values' else None)
+            if kind != 'values':
+                #   The other columns are rebuilt with their dtype, and their missing values from the null mask.
+                values = values.astype(object)
+                values[numpy.load(os.path.join(entry_path, str(position) + '.mask.npy'))] = \
+                    numpy.nan if dtype == 'object' else None
+                values = Series(values, index=index, dtype=pandas.api.types.pandas_dtype(dtype), copy=False)
+            columns[column] = values
+        return DataFrame(columns, index=index, copy=False)
+
+    def __write_entry(self, entry_path: str, dataframe: DataFrame) -> dict:
+        metadata: dict = {'columns': []}
+        for position, column in enumerate(dataframe.columns):
+            series: Series = dataframe[column]
+            values: numpy.ndarray = series.to_numpy()
+            kind: str = 'values'
+            if hasattr(series.dtype, 'numpy_dtype'):
+                #   The nullable numbers and booleans keep their values, with a placeholder for the missing ones.
+                values, kind = series.to_numpy(dtype=series.dtype.numpy_dtype, na_value=0), 'masked'
+            elif values.dtype == object or not isinstance(series.dtype, numpy.dtype):
+                #   The texts are stored as fixed width unicode, which numpy can load without pickling.
+                values, kind = values.astype(str), 'text'
+            if kind != 'values':
+                numpy.save(os.path.join(entry_path, str(position) + '.mask.npy'), series.isna().to_numpy(),
+                           allow_pickle=False)
+            numpy.save(os.path.join(entry_path, str(position) + '.npy'), values, allow_pickle=False)
+            metadata['columns'].append([column, kind, str(series.dtype)])
+        #   A range index is kept as its bounds, as the parsers build it.
+        metadata['range_index'] = None
+        if isinstance(dataframe.index, pandas.RangeIndex):
+            metadata['range_index'] = [dataframe.index.start, dataframe.index.stop, dataframe.index.step]
+        numpy.save(os.path.join(entry_path, 'index.npy'), dataframe.index.to_numpy(), allow_pickle=False)
+        return metadata
@@ -0,0 +1,86 @@
+import re
+import json
+
+__token: re.Pattern = re.compile(
+    r'\s*(?:([{}\[\],:])|"((?:[^"\\]|\\.)*)"|(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)|(true|false|null))')
+__literals: dict = {'true': True, 'false': False, 'null': None}
+#   Run of scalar items of an array that are all followed by a comma, so none of them may continue in the next chunk.
+__scalar_run: re.Pattern = re.compile(
+    r'(?:\s*(?:"(?:[^"\\]|\\.)*"|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|true|false|null)\s*,)+')
+#   Characters that may follow the part of a number already read, up to the end of the buffer.
+__number_tail: re.Pattern = re.compile(r'[0-9.eE+-]*')
+#   Characters that may follow a complete number.
+__delimiters: str = ' \t\r\n,]}'
+
+
+def iterate_values(path: str, chunk_size: int = 1 << 20):
+    #   Yield the keys path and the value of every scalar of a JSON file, reading it by chunks so the memory does not
+    #   grow with the file nor with its arrays. The items of an array share the path of their array.
+    with open(path, encoding='utf-8') as file:
+        buffer: str = ''
+        position: int = 0
+        finished: bool = False
+        #   Each container of the stack keeps whether it is an object, and the current key for the objects.
+        stack: list = []
+        keys: list = []
+        expecting_key: bool = False
+        expecting_item: bool = False
+        while True:
+            #   The complete items of the buffered part of an array are decoded in a single call.
+            if expecting_item:
+                run: re.Match = __scalar_run.match(buffer, position)
+                if run is not None:
+                    position = run.end()
+                    path: tuple = tuple(key for key in keys if key is not None)
+                    for value in json.loads('[' + run.group()[:-1] + ']'):
+                        yield path, value
+                    continue
+            match: re.Match = __token.match(buffer, position)
+            #   A token that reaches the end of the buffer may continue in the next chunk, and so may a number that
+            #   is followed by more characters of a number.
+            if not finished and (match is None or match.end() == len(buffer) or
+                                 (match.group(3) is not None and __number_tail.fullmatch(buffer, match.end()))):
+                buffer, position, finished = __read(file, buffer, position, chunk_size)
+                continue
+            if match is None:
+                if buffer[position:].strip():
+                    raise ValueError('Invalid JSON content at: ' + buffer[position:position + 20])
+                if stack:
+                    raise ValueError('The JSON content ends inside an unclosed ' + ('object' if stack[-1] else 'array'))
+                return
+            punctuation, text, number, literal = match.groups()
+            if number is not None and match.end() < len(buffer) and buffer[match.end()] not in __delimiters:
+                raise ValueError('Invalid JSON content at: ' + buffer[match.start(3):match.start(3) + 20])
+            position = match.end()
+            if punctuation == '{':
+                stack.append(True)
+                keys.append(None)
+                expecting_key = True
+            elif punctuation == '[':
+                stack.append(False)
+                keys.append(None)
+            elif punctuation in ['}', ']']:
+                if not stack or stack[-1] != (punctuation == '}'):
+                    raise ValueError('Unbalanced JSON content at: ' + buffer[match.start(1):match.start(1) + 20])
+                stack.pop()
+                keys.pop()
+            elif punctuation == ',':
+                expecting_key = bool(stack) and stack[-1]
+            elif punctuation == ':':
+                expecting_key = False
+            elif text is not None and expecting_key:
+                keys[-1] = json.loads('"' + text + '"')
+            else:
+                if text is not None:
+                    value = json.loads('"' + text + '"')
+                elif number is not None:
+                    value = json.loads(number)
+                else:
+                    value = __literals[literal]
+                yield tuple(key for key in keys if key is not None), value
+            expecting_item = bool(stack) and not stack[-1] and punctuation in ['[', ',']
+
+
+def __read(file, buffer: str, position: int, chunk_size: int) -> tuple:
+    chunk: str = file.read(chunk_size)
+    return buffer[position:] + chunk, 0, chunk == ''
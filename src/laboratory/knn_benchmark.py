@@ -0,0 +1,45 @@
+import os
+import time
+import numpy
+import pandas
+from pandas import DataFrame
+
+from src.parser import Parser
+from src.machine_learning.knn_model import KNNModel, ALGORITHMS
+
+#   Fit and query throughput of the neighbor search backends against the size of the training set. The history is
+#   repeated with a small noise to reach the larger sizes.
+data_input_path: str = os.path.join(os.path.dirname(__file__), os.path.pardir, os.path.pardir, 'data', 'input')
+repetitions: list = [1, 2, 4, 8]
+leaf_sizes: list = [30]
+k: int = 5
+queries: int = 20000
+
+parser: Parser = Parser()
+consumption_history: DataFrame = pandas.read_csv(os.path.join(data_input_path, 'consumption_history.csv'), sep=';')
+contracted_power_history: DataFrame = pandas.read_csv(os.path.join(data_input_path, 'contracted_power_history.csv'),
+                                                      sep=';')
+meteo_history: DataFrame = parser.read_meteo_info(os.path.join(data_input_path, 'meteo_history.json'))
+context_info_history: DataFrame = parser.build_context_info(contracted_power_history, meteo_history)
+
+generator: numpy.random.Generator = numpy.random.default_rng(11)
+query_positions: numpy.ndarray = generator.integers(0, len(context_info_history), queries)
+query_context_info: DataFrame = context_info_history.iloc[query_positions].reset_index(drop=True)
+
+print('Algorithm;LeafSize;TrainingPoints;FitTime;FitPointsPerSecond;QueryTime;QueriesPerSecond')
+for repetition in repetitions:
+    context_info: DataFrame = pandas.concat([context_info_history] * repetition, ignore_index=True)
+    context_info = context_info + generator.normal(0.0, 0.01, context_info.shape) * (repetition > 1)
+    consumption: DataFrame = pandas.concat([consumption_history] * repetition, ignore_index=True)
+    for algorithm in ALGORITHMS:
+        for leaf_size in leaf_sizes:
+            knn: KNNModel = KNNModel(algorithm=algorithm, leaf_size=leaf_size)
+            start: float = time.perf_counter()
+            knn.fit(context_info, consumption, k)
+            fit_time: float = time.perf_counter() - start
+            start = time.perf_counter()
+            knn.predict(query_context_info)
+            query_time: float = time.perf_counter() - start
+            print(';'.join(str(value) for value in [
+                algorithm, leaf_size, len(context_info), round(fit_time, 4), round(len(context_info) / fit_time),
+                round(query_time, 4), round(queries / query_time)]))
@@ -0,0 +1,48 @@
+import numpy
+
+
+class DecisionCache:
+
+    def __init__(self, features: numpy.ndarray):
+        #   Each coefficient is only compared with its feature column, so the decisions of a candidate over the
+        #   whole horizon only depend on the position of every coefficient among the sorted values of its column.
+        self.__thresholds: list = [numpy.unique(features[:, column]) for column in range(features.shape[1])]
+        self.__costs: dict = {}
+        self.__hits: int = 0
+        self.__misses: int = 0
+
+    def __len__(self) -> int:
+        return len(self.__costs)
+
+    def get_hits(self) -> int:
+        return self.__hits
+
+    def get_misses(self) -> int:
+        return self.__misses
+
+    def get_hit_rate(self) -> float:
+        lookups: int = self.__hits + self.__misses
+        return self.__hits / lookups if lookups > 0 else 0.0
+
+    def get_signatures(self, coefficients: numpy.ndarray) -> list:
+        coefficients = numpy.atleast_2d(coefficients)
+        positions: numpy.ndarray = numpy.column_stack([
+            numpy.searchsorted(thresholds, coefficients[:, column], side='left')
+            for column, thresholds in enumerate(self.__thresholds)])
+        return [tuple(signature) for signature in positions.tolist()]
+
+    def evaluate(self, coefficients: numpy.ndarray, evaluate) -> numpy.ndarray:
+        #   Only the first candidate of every unknown signature is simulated, and the rest reuse its cost.
+        coefficients = numpy.atleast_2d(coefficients)
+        signatures: list = self.get_signatures(coefficients)
+        pending: dict = {}
+        for index, signature in enumerate(signatures):
+            if signature not in self.__costs and signature not in pending:
+                pending[signature] = index
+
+        if pending:
+            costs: numpy.ndarray = evaluate(coefficients[list(pending.values())])
+            self.__costs.update(zip(pending.keys(), costs.tolist()))
+        self.__misses += len(pending)
+        self.__hits += len(signatures) - len(pending)
+        return numpy.array([self.__costs[signature] for signature in signatures], dtype=numpy.float64)
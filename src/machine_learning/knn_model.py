@@ -1,54 +1,408 @@
+import os
+import time
+import pickle
+import hashlib
 import numpy
+import sklearn
 from pandas import DataFrame
-from sklearn.model_selection import train_test_split, cross_val_score
+from pandas.util import hash_pandas_object
+from joblib import Parallel, delayed
+from sklearn.model_selection import train_test_split, KFold
 from sklearn.neighbors import KNeighborsRegressor
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import r2_score
 
+#   Version of the saved artifacts, to be increased whenever their content changes.
+ARTIFACT_VERSION: int = 4
+#   Neighbor search backends, and the type of the coordinates that each one works with.
+ALGORITHMS: dict = {'auto': numpy.float64, 'kd_tree': numpy.float64, 'ball_tree': numpy.float64,
+                    'brute': numpy.float32}
+
 
 class KNNModel:
 
-    def __init__(self):
+    def __init__(self, artifact_path: str = None, k_values: list = None, folds: int = 5, n_jobs: int = -1,
+                 algorithm: str = 'auto', leaf_size: int = 30, batch_size: int = 16384, window: int = None,
+                 drift_threshold: float = 0.25, size_ratio: float = 2.0):
+        if algorithm not in ALGORITHMS:
+            raise ValueError('Unknown neighbor search algorithm: ' + algorithm)
         self.scaler: StandardScaler = StandardScaler()
         self.__knn: KNeighborsRegressor = None
+        self.__artifact_path: str = artifact_path
+        self.__k: int = None
+        self.__validation_score: float = None
+        self.__fingerprint: str = None
+        self.__columns: list = None
+        self.__k_values: list = k_values if k_values is not None else list(range(1, 11))
+        self.__folds: int = folds
+        #   Threads of the cross validation, one per fold up to the processors by default.
+        self.__n_jobs: int = n_jobs
+        self.__k_scores: dict = {}
+        self.__fold_times: list = []
+        self.__algorithm: str = algorithm
+        self.__leaf_size: int = leaf_size
+        self.__batch_size: int = batch_size
+        #   The neighbor store keeps the unscaled points of the fitted index and their scaled coordinates, with the
+        #   order in which they were observed, and the sums of the values and of their squares to follow the scaler
+        #   statistics. Its arrays are preallocated, and only their first rows are in use.
+        self.__window: int = window
+        self.__drift_threshold: float = drift_threshold
+        self.__size_ratio: float = size_ratio
+        self.__x: numpy.ndarray = None
+        self.__y: numpy.ndarray = None
+        self.__sequence: numpy.ndarray = None
+        self.__coordinates: numpy.ndarray = None
+        self.__size: int = 0
+        self.__sums: numpy.ndarray = None
+        self.__squares: numpy.ndarray = None
+        self.__rebuild_size: int = 0
+
+    def get_k(self) -> int:
+        return self.__k
+
+    def get_validation_score(self) -> float:
+        return self.__validation_score
+
+    def get_fingerprint(self) -> str:
+        return self.__fingerprint
+
+    def get_k_scores(self) -> dict:
+        #   Mean squared error of the cross validation for every k.
+        return self.__k_scores
+
+    def get_fold_times(self) -> list:
+        return self.__fold_times
+
+    def get_algorithm(self) -> str:
+        return self.__algorithm
+
+    def get_leaf_size(self) -> int:
+        return self.__leaf_size
+
+    def get_size(self) -> int:
+        #   Number of points of the neighbor store.
+        return self.__size
+
+    def get_drift(self) -> float:
+        #   Largest deviation of the mean, in scaled units, or of the standard deviation, as a ratio, of any column of
+        #   the neighbor store from the statistics of the fitted scaler.
+        size: int = self.get_size()
+        mean: numpy.ndarray = self.__sums / size
+        deviation: numpy.ndarray = numpy.sqrt(numpy.maximum(self.__squares / size - mean ** 2, 0.0))
+        return float(max(numpy.max(numpy.abs(mean - self.scaler.mean_) / self.scaler.scale_),
+                         numpy.max(numpy.abs(deviation / self.scaler.scale_ - 1.0))))
 
     def train(self, context_info: DataFrame, consumption: DataFrame):
-        #   Set the data as input (x) and output (y).
-        x: DataFrame = context_info
-        y: DataFrame = consumption['MagnitudeValue'].to_numpy()[:, numpy.newaxis]
+        #   Skip the training when the saved model was trained with the same data.
+        fingerprint: str = self.fingerprint(context_info, consumption)
+        if self.__artifact_path is not None and self.load(self.__artifact_path, fingerprint):
+            print('The KNN model has been loaded with k:', self.__k)
+            return
 
-        #   Normalize the information.
-        x_scaled: DataFrame = self.scaler.fit_transform(x)
+        #   Set the data as input (x) and output (y). A memory-mapped context is read by batches of rows, so it is
+        #   never copied as a whole.
+        self.__columns = list(context_info.columns)
+        x: numpy.ndarray = context_info.to_numpy()
+        y: numpy.ndarray = consumption['MagnitudeValue'].to_numpy()[:, numpy.newaxis]
+
+        #   Divide the positions of the information into training and validation.
+        train_positions, validation_positions = train_test_split(numpy.arange(len(y)), test_size=0.3,
+                                                                 random_state=11)
+        y_train: numpy.ndarray = y[train_positions]
+        y_validation: numpy.ndarray = y[validation_positions]
 
-        #   Divide the information into training and validation.
-        x_train, x_validation, y_train, y_validation = train_test_split(x_scaled, y, test_size=0.3, random_state=11)
+        #   Normalize the information.
+        self.__fit_scaler(x)
+        x_train: numpy.ndarray = self.__transform(x, train_positions)
 
         #   Apply cross validation to find the best value for k.
-        k_values: list = list(range(1, 11))
-        cv_scores: list = []
-        for k in k_values:
-            knn: KNeighborsRegressor = KNeighborsRegressor(n_neighbors=k)
-            scores = cross_val_score(knn, x_train, y_train, cv=5, scoring='neg_mean_squared_error')
-            cv_scores.append(-scores.mean())
+        k_values: list = self.__k_values
+        cv_scores: list = self.__cross_validate(x_train, y_train, k_values)
+        self.__k_scores = dict(zip(k_values, cv_scores))
 
         #   Take the value for k with the lower mean squared error.
         best_k: int = k_values[cv_scores.index(min(cv_scores))]
         print("The best value for k:", best_k)
 
-        #   Train the model with the best value for k.
-        self.__knn = KNeighborsRegressor(n_neighbors=best_k)
+        #   Train the model with the best value for k, which is set first since the store may refit the index.
+        self.__k = best_k
+        self.__knn = self.__build_regressor(best_k)
         self.__knn.fit(x_train, y_train)
+        self.__set_store(self.__gather(x, train_positions), y_train, train_positions, x_train)
 
         #   Make the predictions for the validation set of data.
-        y_prediction = self.__knn.predict(x_validation)
-        print('The R2 value of the KNN model trained:', r2_score(y_validation, y_prediction))
+        y_prediction: numpy.ndarray = self.__predict_batches(x, validation_positions)
+        self.__validation_score = r2_score(y_validation, y_prediction)
+        self.__fingerprint = fingerprint
+        print('The R2 value of the KNN model trained:', self.__validation_score)
+
+        if self.__artifact_path is not None:
+            self.save(self.__artifact_path)
+
+    def fit(self, context_info: DataFrame, consumption: DataFrame, k: int):
+        #   Train the model with all the data and a given k, without validation.
+        self.__columns = list(context_info.columns)
+        x: numpy.ndarray = context_info.to_numpy()
+        y: numpy.ndarray = consumption['MagnitudeValue'].to_numpy()[:, numpy.newaxis]
+        positions: numpy.ndarray = numpy.arange(len(y))
+        self.__fit_scaler(x)
+        self.__k = k
+        self.__knn = self.__build_regressor(k)
+        coordinates: numpy.ndarray = self.__transform(x, positions)
+        self.__knn.fit(coordinates, y)
+        self.__set_store(self.__gather(x, positions), y, positions, coordinates)
+        self.__validation_score = None
+        self.__fingerprint = None
+
+    def update(self, new_context: DataFrame, new_consumption: DataFrame) -> bool:
+        #   Append the new observations to the neighbor store, evicting the oldest ones beyond the window. The scaler
+        #   and k are kept while the statistics of the store do not drift and its size stays within the ratio of the
+        #   last rebuild, and are fitted again otherwise. Return whether the model has been rebuilt.
+        if self.__knn is None:
+            raise ValueError('The KNN model must be trained before it is updated.')
+        if self.__columns is not None:
+            new_context = new_context[self.__columns]
+        x: numpy.ndarray = new_context.to_numpy(dtype=numpy.float64)
+        y: numpy.ndarray = new_consumption['MagnitudeValue'].to_numpy(dtype=numpy.float64)[:, numpy.newaxis]
+        sequence: numpy.ndarray = self.__sequence[:self.__size].max(initial=-1) + 1 + numpy.arange(len(y))
+        self.__append(x, y, sequence)
+        self.__evict()
+        #   The model no longer corresponds to a history file.
+        self.__fingerprint = None
+
+        size: int = self.get_size()
+        if (self.get_drift() > self.__drift_threshold or size > self.__rebuild_size * self.__size_ratio
+                or size * self.__size_ratio < self.__rebuild_size):
+            self.__rebuild()
+            return True
+        #   Only the new points are scaled and copied into the store. The index is still fitted over the whole store,
+        #   an O(N) pass for the brute force backend, which only validates the coordinates in place, and a rebuild of
+        #   the tree for the others.
+        self.__fit_index()
+        return False
 
     def predict(self, context_info: DataFrame) -> DataFrame:
-        #   Normalize the information.
-        context_info_scaled: DataFrame = self.scaler.fit_transform(context_info)
+        #   The columns are taken in the order of the training, which may differ for a loaded model.
+        if self.__columns is not None:
+            context_info = context_info[self.__columns]
 
-        #   Make the prediction.
-        prediction: DataFrame = self.__knn.predict(context_info_scaled)
+        #   Make the prediction, normalizing the information with the scaling of the training data.
+        prediction: numpy.ndarray = self.__predict_batches(context_info.to_numpy())
 
         #   Return the result.
         return prediction
+
+    def __set_store(self, x: numpy.ndarray, y: numpy.ndarray, sequence: numpy.ndarray, coordinates: numpy.ndarray):
+        #   The coordinates are the scaled points that the index has been fitted with.
+        self.__x = x
+        self.__y = numpy.asarray(y, dtype=numpy.float64)
+        self.__sequence = sequence
+        self.__coordinates = coordinates
+        self.__size = len(y)
+        self.__sums = x.sum(axis=0)
+        self.__squares = (x ** 2).sum(axis=0)
+        self.__rebuild_size = len(y)
+        if self.__evict():
+            self.__knn = self.__build_regressor(self.__k)
+            self.__fit_index()
+            self.__rebuild_size = self.get_size()
+
+    def __append(self, x: numpy.ndarray, y: numpy.ndarray, sequence: numpy.ndarray):
+        #   The arrays of the store double their capacity when they are full, so appending stays amortized O(1) per
+        #   point, as in the ledgers of the entities.
+        size: int = self.__size + len(y)
+        if size > len(self.__y):
+            capacity: int = max(2 * len(self.__y), size)
+            self.__x = self.__grow(self.__x, capacity)
+            self.__y = self.__grow(self.__y, capacity)
+            self.__sequence = self.__grow(self.__sequence, capacity)
+            self.__coordinates = self.__grow(self.__coordinates, capacity)
+        self.__x[self.__size:size] = x
+        self.__y[self.__size:size] = y
+        self.__sequence[self.__size:size] = sequence
+        self.__coordinates[self.__size:size] = self.__scale(x)
+        self.__size = size
+        self.__sums += x.sum(axis=0)
+        self.__squares += (x ** 2).sum(axis=0)
+
+    def __grow(self, values: numpy.ndarray, capacity: int) -> numpy.ndarray:
+        grown: numpy.ndarray = numpy.empty((capacity,) + values.shape[1:], dtype=values.dtype)
+        grown[:self.__size] = values[:self.__size]
+        return grown
+
+    def __evict(self) -> bool:
+        #   Keep the most recent points of the store within the window, in their current order.
+        if self.__window is None or self.get_size() <= self.__window:
+            return False
+        size: int = self.get_size()
+        kept: numpy.ndarray = numpy.sort(numpy.argsort(self.__sequence[:size], kind='stable')[-self.__window:])
+        evicted: numpy.ndarray = numpy.ones(size, dtype=bool)
+        evicted[kept] = False
+        self.__sums -= self.__x[:size][evicted].sum(axis=0)
+        self.__squares -= (self.__x[:size][evicted] ** 2).sum(axis=0)
+        self.__x = self.__x[kept]
+        self.__y = self.__y[kept]
+        self.__sequence = self.__sequence[kept]
+        self.__coordinates = self.__coordinates[kept]
+        self.__size = len(kept)
+        return True
+
+    def __fit_index(self):
+        #   The index is fitted with the rows of the store in use, which are views of its arrays.
+        self.__knn.fit(self.__coordinates[:self.__size], self.__y[:self.__size])
+
+    def __rebuild(self):
+        #   Fit the scaler with the store, select k again and build a new index.
+        size: int = self.get_size()
+        self.__fit_scaler(self.__x[:size])
+        self.__sums = self.__x[:size].sum(axis=0)
+        self.__squares = (self.__x[:size] ** 2).sum(axis=0)
+        self.__coordinates[:size] = self.__scale(self.__x[:size])
+        x_scaled: numpy.ndarray = self.__coordinates[:size]
+        k_values: list = [k for k in self.__k_values if k <= len(x_scaled) * (self.__folds - 1) // self.__folds]
+        cv_scores: list = self.__cross_validate(x_scaled, self.__y[:size], k_values)
+        self.__k_scores = dict(zip(k_values, cv_scores))
+        self.__k = k_values[cv_scores.index(min(cv_scores))]
+        self.__knn = self.__build_regressor(self.__k)
+        self.__fit_index()
+        self.__rebuild_size = self.get_size()
+        print('The KNN model has been rebuilt with k:', self.__k)
+
+    def __scale(self, x: numpy.ndarray) -> numpy.ndarray:
+        return self.__as_coordinates((x - self.scaler.mean_) / self.scaler.scale_)
+
+    def __build_regressor(self, k: int) -> KNeighborsRegressor:
+        return KNeighborsRegressor(n_neighbors=k, algorithm=self.__algorithm, leaf_size=self.__leaf_size)
+
+    def __as_coordinates(self, x: numpy.ndarray) -> numpy.ndarray:
+        return numpy.ascontiguousarray(x, dtype=ALGORITHMS[self.__algorithm])
+
+    def __fit_scaler(self, x: numpy.ndarray):
+        #   The statistics are accumulated by batches of rows, which gives the same scaler as a single fit when the
+        #   rows fit in one batch.
+        self.scaler = StandardScaler()
+        for start in range(0, len(x), self.__batch_size):
+            self.scaler.partial_fit(x[start:start + self.__batch_size])
+
+    def __transform(self, x: numpy.ndarray, positions: numpy.ndarray) -> numpy.ndarray:
+        #   The scaled rows of the positions, written by batches into a single buffer of coordinates.
+        coordinates: numpy.ndarray = numpy.empty((len(positions), x.shape[1]), dtype=ALGORITHMS[self.__algorithm])
+        for start in range(0, len(positions), self.__batch_size):
+            coordinates[start:start + self.__batch_size] = self.scaler.transform(
+                x[positions[start:start + self.__batch_size]])
+        return coordinates
+
+    def __gather(self, x: numpy.ndarray, positions: numpy.ndarray) -> numpy.ndarray:
+        #   The unscaled rows of the positions for the neighbor store, copied by batches.
+        rows: numpy.ndarray = numpy.empty((len(positions), x.shape[1]), dtype=numpy.float64)
+        for start in range(0, len(positions), self.__batch_size):
+            rows[start:start + self.__batch_size] = x[positions[start:start + self.__batch_size]]
+        return rows
+
+    def __predict_batches(self, x: numpy.ndarray, positions: numpy.ndarray = None) -> numpy.ndarray:
+        #   The rows, or the rows of the given positions, are scaled and predicted by batches, so the neighbor
+        #   distances held in memory do not grow with the horizon.
+        if positions is None:
+            positions = numpy.arange(len(x))
+        prediction: numpy.ndarray = numpy.empty((len(positions), 1))
+        for start in range(0, len(positions), self.__batch_size):
+            prediction[start:start + self.__batch_size] = self.__knn.predict(
+                self.__transform(x, positions[start:start + self.__batch_size]))
+        return prediction
+
+    def __cross_validate(self, x: numpy.ndarray, y: numpy.ndarray, k_values: list) -> list:
+        #   Each fold queries the neighbors of its validation points once with the largest k, and the predictions of
+        #   the smaller values of k are the cumulative means of the sorted neighbor targets.
+        start: float = time.perf_counter()
+        folds: list = list(KFold(n_splits=self.__folds).split(x))
+        results: list = Parallel(n_jobs=self.__n_jobs, prefer='threads')(
+            delayed(self.__fold_errors)(self.__build_regressor(max(k_values)), x[train], y[train], x[validation],
+                                        y[validation])
+            for train, validation in folds)
+        self.__fold_times = [fold_time for _, fold_time in results]
+        errors: numpy.ndarray = numpy.mean([fold_errors for fold_errors, _ in results], axis=0)
+        scores: list = [float(errors[k - 1]) for k in k_values]
+        print('The cross validation scores for k:', dict(zip(k_values, [round(score, 3) for score in scores])))
+        print('The cross validation of k took:', round(time.perf_counter() - start, 3), 's, by fold:',
+              [round(fold_time, 3) for fold_time in self.__fold_times])
+        return scores
+
+    @staticmethod
+    def __fold_errors(knn: KNeighborsRegressor, x_train: numpy.ndarray, y_train: numpy.ndarray,
+                      x_validation: numpy.ndarray, y_validation: numpy.ndarray) -> tuple:
+        start: float = time.perf_counter()
+        max_k: int = knn.n_neighbors
+        knn.fit(x_train, y_train)
+        neighbors: numpy.ndarray = knn.kneighbors(x_validation, return_distance=False)
+        targets: numpy.ndarray = y_train[neighbors, 0]
+        predictions: numpy.ndarray = numpy.cumsum(targets, axis=1) / numpy.arange(1, max_k + 1)
+        errors: numpy.ndarray = numpy.mean((predictions - y_validation) ** 2, axis=0)
+        return errors, time.perf_counter() - start
+
+    def save(self, path: str):
+        artifact: dict = {
+            'version': ARTIFACT_VERSION,
+            'sklearn_version': sklearn.__version__,
+            'scaler': self.scaler,
+            'k': self.__k,
+            'knn': self.__knn,
+            'fingerprint': self.__fingerprint,
+            'columns': self.__columns,
+            'validation_score': self.__validation_score,
+            'algorithm': self.__algorithm,
+            'leaf_size': self.__leaf_size,
+            'x': self.__x[:self.__size],
+            'y': self.__y[:self.__size],
+            'sequence': self.__sequence[:self.__size],
+            'rebuild_size': self.__rebuild_size
+        }
+        #   The artifact is replaced atomically, so an interrupted save never leaves a truncated file.
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temporary_path: str = path + '.tmp'
+        with open(temporary_path, 'wb') as artifact_file:
+            pickle.dump(artifact, artifact_file)
+        os.replace(temporary_path, path)
+
+    def load(self, path: str, fingerprint: str = None) -> bool:
+        #   The artifacts of other versions, or trained with other data when a fingerprint is given, are not loaded.
+        try:
+            with open(path, 'rb') as artifact_file:
+                artifact: dict = pickle.load(artifact_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return False
+        if artifact.get('version') != ARTIFACT_VERSION or artifact.get('sklearn_version') != sklearn.__version__:
+            return False
+        if fingerprint is not None and artifact['fingerprint'] != fingerprint:
+            return False
+        #   The index of the artifact must have been built by the configured backend.
+        if artifact['algorithm'] != self.__algorithm or artifact['leaf_size'] != self.__leaf_size:
+            return False
+        self.scaler = artifact['scaler']
+        self.__k = artifact['k']
+        self.__knn = artifact['knn']
+        self.__fingerprint = artifact['fingerprint']
+        self.__columns = artifact['columns']
+        self.__validation_score = artifact['validation_score']
+        self.__x = artifact['x']
+        self.__y = artifact['y']
+        self.__sequence = artifact['sequence']
+        self.__coordinates = self.__scale(self.__x)
+        self.__size = len(self.__y)
+        self.__sums = self.__x.sum(axis=0)
+        self.__squares = (self.__x ** 2).sum(axis=0)
+        self.__rebuild_size = artifact['rebuild_size']
+        return True
+
+    def fingerprint(self, context_info: DataFrame, consumption: DataFrame) -> str:
+        #   The columns are sorted, since the order of the context columns is not stable between executions, and
+        #   hashed one by one, so a memory-mapped context is not copied as a whole. The search of k is part of the
+        #   key, so a model selected over other values of k or folds is trained again.
+        columns: list = sorted(context_info.columns)
+        digest = hashlib.sha256()
+        digest.update(repr((list(self.__k_values), self.__folds)).encode())
+        digest.update(repr([(str(column), str(context_info[column].dtype)) for column in columns]).encode())
+        digest.update(hash_pandas_object(context_info.index).to_numpy().tobytes())
+        for column in columns:
+            digest.update(hash_pandas_object(context_info[column], index=False).to_numpy().tobytes())
+        digest.update(numpy.ascontiguousarray(consumption['MagnitudeValue'].to_numpy(dtype=numpy.float64)).tobytes())
+        return digest.hexdigest()
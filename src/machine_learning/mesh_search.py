@@ -1,76 +1,173 @@
+import multiprocessing
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy
 from pandas import DataFrame
 
-from src.parser import Parser
 from src.entities.entities_manager import EntitiesManager
 from src.measurement import Measurement
-from src.policies.optimizer_policy import OptimizerPolicy
+from src.simulation_clock import SimulationClock
+from src.policies.batched_optimizer_policy import BatchedOptimizerPolicy, COEFFICIENTS
+from src.policies.horizon_features import HorizonFeatures
+from src.policies.drivers_table import load_drivers_table
+from src.machine_learning.search_strategies import SearchStrategy, SearchReport, GridStrategy
+from src.machine_learning.decision_cache import DecisionCache
+
+#   Read-only inputs of the search. They are set before the workers are forked, so the processes inherit them
+#   instead of receiving a pickled copy with every task.
+_shared_inputs: dict = {}
+
+
+def _initialize_worker(inputs: tuple):
+    _shared_inputs.clear()
+    _shared_inputs['inputs'] = inputs
+    #   The drivers are compiled before the workers are forked, so every process reuses the same table.
+    load_drivers_table()
+
+
+def _evaluate_chunk(coefficients: numpy.ndarray, fidelity: float = 1.0) -> numpy.ndarray:
+    clock: SimulationClock = _get_clock(fidelity)
+    policy: BatchedOptimizerPolicy = BatchedOptimizerPolicy(coefficients, _get_entities_manager())
+    policy.simulate(clock, _get_features(clock))
+    return policy.get_costs()
+
+
+def _get_features(clock: SimulationClock) -> HorizonFeatures:
+    #   The features of every simulated horizon are computed once per process.
+    features: dict = _shared_inputs.setdefault('features', {})
+    if len(clock) not in features:
+        features[len(clock)] = HorizonFeatures(_get_entities_manager(), clock)
+    return features[len(clock)]
+
+
+def _get_clock(fidelity: float) -> SimulationClock:
+    clock: SimulationClock = _shared_inputs['inputs'][-1]
+    #   The partial evaluations simulate only the first part of the horizon.
+    if fidelity < 1.0:
+        clock = clock.get_horizon(max(1, int(round(len(clock) * fidelity))))
+    return clock
+
+
+def _get_entities_manager() -> EntitiesManager:
+    #   The batched policy does not modify the entities, so every process builds them once.
+    if 'entities_manager' not in _shared_inputs:
+        _shared_inputs['entities_manager'] = _set_entities_manager(*_shared_inputs['inputs'][:-1])
+    return _shared_inputs['entities_manager']
+
+
+def _set_entities_manager(technical_characteristics: DataFrame, meteo_data: DataFrame,
+                          contracted_power_data: DataFrame, filtered_purchase_prices: DataFrame,
+                          sale_price: Measurement, consumption_data: DataFrame) -> EntitiesManager:
+    entities_manager: EntitiesManager = EntitiesManager(technical_characteristics)
+    [pv.update_generation(meteo_data) for pv in entities_manager.get_photovoltaic_plates()]
+    [pod.update_max_output_power(contracted_power_data) for pod in
+     entities_manager.get_points_of_grid_delivery()]
+    [pod.update_purchase_prices(filtered_purchase_prices) for pod in
+     entities_manager.get_points_of_grid_delivery()]
+    [pod.update_sale_price(sale_price) for pod in
+     entities_manager.get_points_of_grid_delivery()]
+    [poc.update_consumption(consumption_data) for poc in
+     entities_manager.get_points_of_consumption()]
+    return entities_manager
 
 
 class MeshSearch:
 
-    def __init__(self):
-        self.__parser: Parser = Parser()
+    def __init__(self, workers: int = 1, chunk_size: int = None, verbose: bool = False,
+                 strategy: SearchStrategy = None, cache: bool = True):
+        self.__workers: int = workers
+        self.__chunk_size: int = chunk_size
+        self.__verbose: bool = verbose
         self.__lower_cost: Measurement = Measurement(1e100, '€')
         self.__consumption_coefficients: list = [x / 100 for x in range(40, 61, 5)]
         self.__purchase_price_coefficients: list = [x / 100 for x in range(40, 61, 5)]
         self.__consumption_low_coefficients: list = [x / 100 for x in range(40, 61, 5)]
         self.__generation_low_coefficients: list = [x / 100 for x in range(40, 61, 5)]
         self.__purchase_price_low_coefficients: list = [x / 100 for x in range(40, 61, 5)]
+        #   Without a strategy, the whole mesh of the coefficient lists is evaluated.
+        self.__strategy: SearchStrategy = strategy if strategy is not None else GridStrategy(values=[
+            self.__consumption_coefficients, self.__purchase_price_coefficients, self.__consumption_low_coefficients,
+            self.__generation_low_coefficients, self.__purchase_price_low_coefficients])
         self.__best_coefficients: dict = {}
+        self.__report: SearchReport = None
+        self.__cache: bool = cache
+        #   One decision cache per simulated horizon length, since the signatures depend on the horizon.
+        self.__decision_caches: dict = {}
 
     def search(self, technical_characteristics: DataFrame, meteo_data: DataFrame, contracted_power_data: DataFrame,
                filtered_purchase_prices: DataFrame, sale_price: Measurement, consumption_data: DataFrame,
-               initial_datetime: str, final_datetime: str, time_lapse: float) -> dict:
-
-        for consumption_coefficient in self.__consumption_coefficients:
-            for purchase_price_coefficient in self.__purchase_price_coefficients:
-                for consumption_low_coefficient in self.__consumption_low_coefficients:
-                    for generation_low_coefficient in self.__generation_low_coefficients:
-                        for purchase_price_low_coefficient in self.__purchase_price_low_coefficients:
-
-                            entities_manager: EntitiesManager = self.__set_policy(
-                                technical_characteristics, meteo_data, contracted_power_data, filtered_purchase_prices,
-                                sale_price, consumption_data)
-
-                            coefficients: dict = {
-                                'consumption_slope': consumption_coefficient,
-                                'purchase_price_slope': purchase_price_coefficient,
-                                'consumption_low': consumption_low_coefficient,
-                                'generation_low': generation_low_coefficient,
-                                'purchase_price_low': purchase_price_low_coefficient
-                            }
-                            policy: OptimizerPolicy = OptimizerPolicy(coefficients, entities_manager)
-                            policy.simulate(initial_datetime, final_datetime, time_lapse)
-
-                            entities: list = entities_manager.get_entities()
-                            simulation: DataFrame = self.__parser.merge_simulation_data(initial_datetime,
-                                                                                        final_datetime, time_lapse,
-                                                                                        entities)
-                            simulation_cost: Measurement = self.__parser.calculate_cost(simulation, entities,
-                                                                                        time_lapse)
-                            
-                            print('Coefficients:', coefficients)
-                            print('Policy cost:', simulation_cost)
-
-                            if simulation_cost.value < self.__lower_cost.value:
-                                self.__lower_cost = simulation_cost
-                                self.__best_coefficients = coefficients
+               clock: SimulationClock) -> dict:
+
+        inputs: tuple = (technical_characteristics, meteo_data, contracted_power_data, filtered_purchase_prices,
+                         sale_price, consumption_data, clock)
+        _initialize_worker(inputs)
+        self.__decision_caches = {}
+        executor: ProcessPoolExecutor = self.__build_executor(inputs)
+        try:
+            self.__report = self.__strategy.search(
+                lambda coefficients, fidelity: self.__evaluate(coefficients, fidelity, executor))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            _shared_inputs.clear()
+
+        if self.__report.best_coefficients is not None and self.__report.best_cost < self.__lower_cost.value:
+            self.__lower_cost = Measurement(self.__report.best_cost, '€')
+            self.__best_coefficients = {name: float(value) for name, value in
+                                        zip(COEFFICIENTS, self.__report.best_coefficients)}
 
         print('Best coefficients:', self.__best_coefficients)
+        if self.__decision_caches:
+            hits: int = sum(cache.get_hits() for cache in self.__decision_caches.values())
+            lookups: int = hits + sum(cache.get_misses() for cache in self.__decision_caches.values())
+            print('Decision cache hit rate:', hits / lookups if lookups > 0 else 0.0)
 
         return self.__best_coefficients
 
-    def __set_policy(self, technical_characteristics: DataFrame, meteo_data: DataFrame,
-                     contracted_power_data: DataFrame, filtered_purchase_prices: DataFrame, sale_price: Measurement,
-                     consumption_data: DataFrame) -> EntitiesManager:
-        entities_manager: EntitiesManager = EntitiesManager(technical_characteristics)
-        [pv.update_generation(meteo_data) for pv in entities_manager.get_photovoltaic_plates()]
-        [pod.update_max_output_power(contracted_power_data) for pod in
-         entities_manager.get_points_of_grid_delivery()]
-        [pod.update_purchase_prices(filtered_purchase_prices) for pod in
-         entities_manager.get_points_of_grid_delivery()]
-        [pod.update_sale_price(sale_price) for pod in
-         entities_manager.get_points_of_grid_delivery()]
-        [poc.update_consumption(consumption_data) for poc in
-         entities_manager.get_points_of_consumption()]
-        return entities_manager
+    def get_report(self) -> SearchReport:
+        return self.__report
+
+    def get_lower_cost(self) -> Measurement:
+        return self.__lower_cost
+
+    def get_decision_caches(self) -> dict:
+        return self.__decision_caches
+
+    def __build_executor(self, inputs: tuple) -> ProcessPoolExecutor:
+        if self.__workers <= 1:
+            return None
+        if 'fork' in multiprocessing.get_all_start_methods():
+            return ProcessPoolExecutor(max_workers=self.__workers, mp_context=multiprocessing.get_context('fork'))
+        return ProcessPoolExecutor(max_workers=self.__workers, initializer=_initialize_worker, initargs=(inputs,))
+
+    def __evaluate(self, coefficients: numpy.ndarray, fidelity: float,
+                   executor: ProcessPoolExecutor) -> numpy.ndarray:
+        if not self.__cache:
+            costs: numpy.ndarray = self.__simulate(coefficients, fidelity, executor)
+        else:
+            clock: SimulationClock = _get_clock(fidelity)
+            steps: int = len(clock)
+            if steps not in self.__decision_caches:
+                self.__decision_caches[steps] = DecisionCache(_get_features(clock).get_thresholds())
+            costs: numpy.ndarray = self.__decision_caches[steps].evaluate(
+                coefficients, lambda pending: self.__simulate(pending, fidelity, executor))
+
+        if self.__verbose:
+            for coefficient_set, cost in zip(coefficients, costs):
+                print('Coefficients:', dict(zip(COEFFICIENTS, coefficient_set.tolist())))
+                print('Policy cost:', cost)
+        return costs
+
+    def __simulate(self, coefficients: numpy.ndarray, fidelity: float,
+                   executor: ProcessPoolExecutor) -> numpy.ndarray:
+        #   By default every worker receives a single chunk, since each chunk pays the horizon set up once.
+        chunk_size: int = self.__chunk_size if self.__chunk_size is not None else \
+            max(1, -(-len(coefficients) // max(1, self.__workers)))
+        chunks: list = [coefficients[index:index + chunk_size] for index in range(0, len(coefficients), chunk_size)]
+        if executor is None or len(chunks) <= 1:
+            costs: numpy.ndarray = numpy.concatenate([_evaluate_chunk(chunk, fidelity) for chunk in chunks])
+        else:
+            #   The costs keep the order of the candidates, so ties are always resolved towards the first one.
+            costs: numpy.ndarray = numpy.concatenate(list(executor.map(_evaluate_chunk, chunks, repeat(fidelity))))
+        return costs
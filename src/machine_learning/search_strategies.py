@@ -0,0 +1,246 @@
+import math
+import time
+import warnings
+import itertools
+import numpy
+from scipy.stats import qmc
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import Matern
+from sklearn.exceptions import ConvergenceWarning
+
+
+class SearchReport:
+
+    def __init__(self, strategy: str):
+        self.strategy: str = strategy
+        self.best_coefficients: numpy.ndarray = None
+        self.best_cost: float = math.inf
+        #   Number of simulations, counted as fractions of the horizon for the partial ones.
+        self.evaluations: float = 0.0
+        #   Pairs of (evaluations, best cost) after every evaluated batch.
+        self.history: list = []
+        self.converged: bool = False
+        self.elapsed_time: float = 0.0
+
+
+class SearchStrategy:
+
+    def __init__(self, budget: int = None, low: float = 0.0, high: float = 1.0, resolution: float = 0.01,
+                 dimensions: int = 5, values: list = None, seed: int = 11):
+        self._budget: int = budget
+        #   The coefficients of every dimension are restricted to a grid of values, either given or built from the
+        #   range and the resolution, and the strategies move over the positions of that grid.
+        if values is None:
+            points: int = int(round((high - low) / resolution)) + 1
+            values = [[round(low + resolution * point, 10) for point in range(points)]] * dimensions
+        self._values: list = [numpy.asarray(dimension_values, dtype=numpy.float64) for dimension_values in values]
+        self._seed: int = seed
+        self._random: numpy.random.Generator = numpy.random.default_rng(seed)
+        self._report: SearchReport = None
+        self._costs: dict = {}
+
+    def search(self, evaluate) -> SearchReport:
+        #   The evaluate function receives a matrix of coefficients, one row per candidate, and the fraction of the
+        #   horizon to simulate, and returns the cost of every candidate.
+        self._report = SearchReport(type(self).__name__)
+        self._random = numpy.random.default_rng(self._seed)
+        self._costs = {}
+        start: float = time.perf_counter()
+        self._explore(evaluate)
+        self._report.elapsed_time = time.perf_counter() - start
+        return self._report
+
+    def _explore(self, evaluate):
+        raise NotImplementedError
+
+    def _exhausted(self) -> bool:
+        return self._budget is not None and self._report.evaluations >= self._budget - 1e-9
+
+    def _evaluate(self, evaluate, positions: numpy.ndarray, fidelity: float = 1.0) -> numpy.ndarray:
+        positions = numpy.atleast_2d(numpy.asarray(positions, dtype=numpy.int64))
+        costs: numpy.ndarray = numpy.full(len(positions), numpy.nan)
+        keys: list = [tuple(position) for position in positions.tolist()]
+
+        #   Only the candidates that have not been simulated yet over the whole horizon consume budget.
+        pending: list = []
+        for key in keys:
+            if (fidelity < 1.0 or key not in self._costs) and key not in pending:
+                pending.append(key)
+        if self._budget is not None:
+            pending = pending[:max(0, int((self._budget - self._report.evaluations) / fidelity + 1e-9))]
+
+        results: dict = {}
+        if pending:
+            pending_costs: numpy.ndarray = numpy.asarray(evaluate(self._to_coefficients(numpy.array(pending)),
+                                                                  fidelity), dtype=numpy.float64)
+            self._report.evaluations += len(pending) * fidelity
+            results = dict(zip(pending, pending_costs.tolist()))
+            if fidelity >= 1.0:
+                self._costs.update(results)
+                for key in pending:
+                    if results[key] < self._report.best_cost:
+                        self._report.best_cost = results[key]
+                        self._report.best_coefficients = self._to_coefficients(numpy.array([key]))[0]
+            self._report.history.append((self._report.evaluations, self._report.best_cost))
+
+        for index, key in enumerate(keys):
+            if key in results:
+                costs[index] = results[key]
+            elif fidelity >= 1.0 and key in self._costs:
+                costs[index] = self._costs[key]
+        return costs
+
+    def _to_coefficients(self, positions: numpy.ndarray) -> numpy.ndarray:
+        return numpy.column_stack([self._values[dimension][positions[:, dimension]]
+                                   for dimension in range(len(self._values))])
+
+    def _sample(self, candidates: int) -> numpy.ndarray:
+        sampler: qmc.Sobol = qmc.Sobol(len(self._values), scramble=True, seed=self._random)
+        #   Sobol sequences keep their balance properties only for powers of two.
+        points: numpy.ndarray = sampler.random_base2(max(0, math.ceil(math.log2(max(candidates, 1)))))[:candidates]
+        sizes: numpy.ndarray = numpy.array([len(dimension_values) for dimension_values in self._values])
+        return numpy.minimum((points * sizes).astype(numpy.int64), sizes - 1)
+
+
+class GridStrategy(SearchStrategy):
+
+    def _explore(self, evaluate):
+        positions: numpy.ndarray = numpy.array(list(itertools.product(
+            *[range(len(dimension_values)) for dimension_values in self._values])))
+        self._evaluate(evaluate, positions)
+        self._report.converged = len(self._costs) == len(positions)
+
+
+class CoordinateDescentStrategy(SearchStrategy):
+
+    def __init__(self, budget: int = 300, initial_step: int = None, **kwargs):
+        super().__init__(budget, **kwargs)
+        self.__initial_step: int = initial_step
+
+    def _explore(self, evaluate):
+        current: numpy.ndarray = numpy.array([len(dimension_values) // 2 for dimension_values in self._values])
+        current_cost: float = self._evaluate(evaluate, current)[0]
+        step: int = self.__initial_step or \
+            max(1, max(len(dimension_values) for dimension_values in self._values) // 4)
+
+        #   Move along one coefficient at a time and halve the step after a sweep without improvement.
+        while step >= 1 and not self._exhausted():
+            improved: bool = False
+            for dimension in range(len(self._values)):
+                neighbours: numpy.ndarray = numpy.tile(current, (2, 1))
+                neighbours[:, dimension] = numpy.clip(current[dimension] + numpy.array([-step, step]), 0,
+                                                      len(self._values[dimension]) - 1)
+                costs: numpy.ndarray = self._evaluate(evaluate, neighbours)
+                if numpy.all(numpy.isnan(costs)):
+                    break
+                best: int = int(numpy.nanargmin(costs))
+                if costs[best] < current_cost:
+                    current, current_cost, improved = neighbours[best], costs[best], True
+            if not improved:
+                step //= 2
+        self._report.converged = step < 1
+
+
+class SamplingStrategy(SearchStrategy):
+
+    def __init__(self, budget: int = 300, sobol: bool = True, batch_size: int = 64, patience: int = 3, **kwargs):
+        super().__init__(budget, **kwargs)
+        self.__sobol: bool = sobol
+        self.__batch_size: int = batch_size
+        self.__patience: int = patience
+
+    def _explore(self, evaluate):
+        stalled: int = 0
+        while not self._exhausted() and stalled < self.__patience:
+            best_cost: float = self._report.best_cost
+            if self.__sobol:
+                positions: numpy.ndarray = self._sample(self.__batch_size)
+            else:
+                positions: numpy.ndarray = numpy.column_stack([
+                    self._random.integers(0, len(dimension_values), self.__batch_size)
+                    for dimension_values in self._values])
+            self._evaluate(evaluate, positions)
+            stalled = stalled + 1 if self._report.best_cost >= best_cost else 0
+        self._report.converged = stalled >= self.__patience
+
+
+class SuccessiveHalvingStrategy(SearchStrategy):
+
+    def __init__(self, budget: int = 300, candidates: int = None, reduction: int = 3, min_fidelity: float = 0.25,
+                 **kwargs):
+        super().__init__(budget, **kwargs)
+        #   Without a number of candidates, the first round is as large as the budget allows.
+        self.__candidates: int = candidates
+        self.__reduction: int = reduction
+        #   Shortest part of the horizon that is simulated, since the first steps alone do not rank the candidates.
+        self.__min_fidelity: float = min(1.0, min_fidelity)
+
+    def _explore(self, evaluate):
+        #   The fidelities grow geometrically from the minimum up to the whole horizon, one round per reduction.
+        rounds: int = max(0, math.ceil(math.log(1.0 / self.__min_fidelity) / math.log(self.__reduction) - 1e-9))
+        fidelities: list = [self.__min_fidelity ** ((rounds - round_index) / rounds) if rounds > 0 else 1.0
+                            for round_index in range(rounds + 1)]
+        candidates: int = self.__candidates
+        if candidates is None:
+            #   Every candidate of the first round costs its share of the fidelities of the rounds it may survive.
+            cost: float = sum(fidelity * float(self.__reduction) ** -round_index
+                              for round_index, fidelity in enumerate(fidelities))
+            candidates = max(1, int(self._budget / cost)) if self._budget is not None else 3 ** 5
+        population: numpy.ndarray = numpy.unique(self._sample(candidates), axis=0)
+
+        #   Every round simulates a longer part of the horizon and keeps the best fraction of the candidates.
+        fidelity: float = fidelities[0]
+        for fidelity in fidelities:
+            if self._exhausted():
+                break
+            costs: numpy.ndarray = self._evaluate(evaluate, population, fidelity)
+            evaluated: numpy.ndarray = ~numpy.isnan(costs)
+            population, costs = population[evaluated], costs[evaluated]
+            if fidelity >= 1.0 or len(population) == 0:
+                break
+            survivors: int = max(1, len(population) // self.__reduction)
+            population = population[numpy.argsort(costs, kind='stable')[:survivors]]
+        self._report.converged = fidelity >= 1.0 and len(population) > 0
+
+
+class SurrogateStrategy(SearchStrategy):
+
+    def __init__(self, budget: int = 300, initial_points: int = 32, batch_size: int = 16, pool_size: int = 4096,
+                 exploration: float = 2.0, patience: int = 4, **kwargs):
+        super().__init__(budget, **kwargs)
+        self.__initial_points: int = initial_points
+        self.__batch_size: int = batch_size
+        self.__pool_size: int = pool_size
+        self.__exploration: float = exploration
+        self.__patience: int = patience
+
+    def _explore(self, evaluate):
+        sizes: numpy.ndarray = numpy.array([len(dimension_values) for dimension_values in self._values])
+        self._evaluate(evaluate, self._sample(self.__initial_points))
+        stalled: int = 0
+        while not self._exhausted() and stalled < self.__patience:
+            best_cost: float = self._report.best_cost
+            positions: numpy.ndarray = numpy.array(list(self._costs.keys()))
+            costs: numpy.ndarray = numpy.array(list(self._costs.values()))
+            #   The costs are deterministic, so the surrogate only needs a small jitter instead of a noise kernel.
+            surrogate: GaussianProcessRegressor = GaussianProcessRegressor(
+                kernel=Matern(nu=2.5), alpha=1e-6, normalize_y=True, random_state=self._seed)
+            #   The cost surface has plateaus, so the kernel scales often end at their bounds.
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', ConvergenceWarning)
+                surrogate.fit(positions / numpy.maximum(sizes - 1, 1), costs)
+
+            #   The pool mixes global samples with perturbations of the best candidate found so far.
+            best: numpy.ndarray = positions[int(numpy.argmin(costs))]
+            local: numpy.ndarray = numpy.clip(
+                best + self._random.integers(-2, 3, (self.__pool_size // 2, len(sizes))), 0, sizes - 1)
+            pool: numpy.ndarray = numpy.unique(numpy.vstack([self._sample(self.__pool_size // 2), local]), axis=0)
+            pool = numpy.array([position for position in pool if tuple(position.tolist()) not in self._costs])
+            if len(pool) == 0:
+                break
+
+            mean, deviation = surrogate.predict(pool / numpy.maximum(sizes - 1, 1), return_std=True)
+            bound: numpy.ndarray = mean - self.__exploration * deviation
+            self._evaluate(evaluate, pool[numpy.argsort(bound, kind='stable')[:self.__batch_size]])
+            stalled = stalled + 1 if self._report.best_cost >= best_cost else 0
+        self._report.converged = stalled >= self.__patience
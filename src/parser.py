@@ -1,185 +1,159 @@
 import os
+import numpy
 import pandas
-from pandas import DataFrame
-from datetime import datetime, timedelta
+from pandas import DataFrame, Index
+from datetime import datetime
 import matplotlib.pyplot as plt
 
-from src.entities.battery import Battery
-from src.entities.photovoltaic_plate import PhotovoltaicPlate
 from src.entities.point_of_grid_delivery import PointOfGridDelivery
-from src.entities.point_of_consumption import PointOfConsumption
+from src.entities.time_series import TimeSeries
 from src.measurement import Measurement
+from src.simulation_clock import SimulationClock
+from src.simulation_result import SimulationResult
+from src.cost_engine import CostEngine, CostBreakdown
+from src.json_stream import iterate_values
+from src.context_features import FEATURE_DTYPE, CALENDAR_FEATURES, as_datetimes, build_calendar_features
 
 
 class Parser:
 
     def __init__(self):
         self.__meteo_datetime_format: str = '%Y-%m-%dT%H:%M'
-        self.__datetime_format: str = '%Y-%m-%d %H:%M:%S'
-
-    def convert_meteo_info_into_dataframe(self, meteo_info: dict) -> DataFrame:
-        initial_date: datetime = datetime.strptime(meteo_info['hourly']['time'][0], self.__meteo_datetime_format)
-        final_date: datetime = datetime.strptime(meteo_info['hourly']['time'][-1], self.__meteo_datetime_format)
-        weather_variables: list = ['temperature_2m', 'direct_radiation', 'precipitation', 'relativehumidity_2m']
-        weather_values: dict = meteo_info['hourly']
-        weather_units: dict = meteo_info['hourly_units']
-
-        dates: list = [initial_date]
-        count: int = 1
-        while dates[-1] != final_date+timedelta(minutes=45):
-            dates.append(initial_date + timedelta(minutes=15 * count))
-            count += 1
-
-        result: DataFrame = DataFrame()
-        for weather_variable in weather_variables:
-            weather_info: DataFrame = DataFrame()
-            values: list = [value for value in weather_values[weather_variable] for _ in range(4)]
-            units: str = weather_units[weather_variable]
-            weather_info['InitialDatetime'] = dates
-            weather_info['FinalDatetime'] = weather_info['InitialDatetime'].apply(lambda x: x + timedelta(minutes=15))
-            weather_info['Magnitude'] = weather_variable
-            weather_info['MagnitudeValue'] = values
-            weather_info['MagnitudeUnits'] = units
-            result = pandas.concat([result, weather_info])
-
-        result['MagnitudeUnits'] = result['MagnitudeUnits'].apply(lambda x: x.replace('Â', ''))
-
-        return result
-
-    def build_context_info(self, contracted_power: DataFrame, meteo_info: DataFrame) -> DataFrame:
-        result: DataFrame = DataFrame()
-        result['contracted_power'] = contracted_power['MagnitudeValue']
-        weather_params: list = list(set(list(meteo_info['Magnitude'])))
-        for weather_param in weather_params:
-            result[weather_param] = meteo_info[meteo_info['Magnitude'] == weather_param]['MagnitudeValue']
-        return result
+        self.__weather_variables: list = ['temperature_2m', 'direct_radiation', 'precipitation', 'relativehumidity_2m']
+
+    def get_weather_variables(self) -> list:
+        return self.__weather_variables
+
+    def get_meteo_datetime_format(self) -> str:
+        return self.__meteo_datetime_format
+
+    def convert_meteo_info_into_dataframe(self, meteo_info: dict, interpolate: bool = False) -> DataFrame:
+        weather_values: dict = {weather_variable: pandas.Series(meteo_info['hourly'][weather_variable]).to_numpy()
+                                for weather_variable in self.__weather_variables}
+        return self.__build_meteo_dataframe(meteo_info['hourly']['time'][0], meteo_info['hourly']['time'][-1],
+                                            weather_values, meteo_info['hourly_units'], interpolate)
+
+    def read_meteo_info(self, meteo_path: str, interpolate: bool = False) -> DataFrame:
+        times, weather_values, weather_units = self.read_hourly_meteo(meteo_path)
+        return self.__build_meteo_dataframe(times[0], times[-1], weather_values, weather_units, interpolate)
+
+    def read_hourly_meteo(self, meteo_path: str) -> tuple:
+        #   Stream the JSON file, so only the hourly values of the weather variables are kept in memory. Return the
+        #   first and last hourly times, and the values and units by weather variable.
+        times: list = []
+        weather_values: dict = {}
+        weather_units: dict = {}
+        for keys, value in iterate_values(meteo_path):
+            if len(keys) != 2:
+                continue
+            if keys == ('hourly', 'time'):
+                #   Only the first and the last times are kept.
+                times = [value] if not times else [times[0], value]
+            elif keys[0] == 'hourly' and keys[1] in self.__weather_variables:
+                weather_values.setdefault(keys[1], []).append(value)
+            elif keys[0] == 'hourly_units':
+                weather_units[keys[1]] = value
+        if len(times) == 1:
+            times = [times[0], times[0]]
+        weather_values = {weather_variable: pandas.Series(values).to_numpy()
+                          for weather_variable, values in weather_values.items()}
+        return times, weather_values, weather_units
+
+    def build_context_info(self, contracted_power: DataFrame, meteo_info: DataFrame,
+                           holidays: list = None) -> DataFrame:
+        #   One row per record of contracted power, with the weather variables of its datetime, NaN when the
+        #   meteorological info does not cover it, and the calendar features. The columns are views of a single
+        #   contiguous matrix.
+        datetimes: numpy.ndarray = as_datetimes(contracted_power['InitialDatetime'])
+        meteo_info = meteo_info.drop_duplicates(['InitialDatetime', 'Magnitude'])
+        weather_codes, weather_params = pandas.factorize(meteo_info['Magnitude'])
+        meteo_datetimes, meteo_positions = numpy.unique(as_datetimes(meteo_info['InitialDatetime']),
+                                                        return_inverse=True)
+        #   Pivot the meteorological info once, with one row per sorted datetime and one column per variable.
+        weather_values: numpy.ndarray = numpy.full((len(meteo_datetimes), len(weather_params)), numpy.nan)
+        weather_values[meteo_positions, weather_codes] = meteo_info['MagnitudeValue'].to_numpy(dtype=numpy.float64)
+
+        columns: list = ['contracted_power'] + list(weather_params) + CALENDAR_FEATURES
+        features: numpy.ndarray = numpy.empty((len(datetimes), len(columns)), dtype=FEATURE_DTYPE)
+        features[:, 0] = contracted_power['MagnitudeValue'].to_numpy(dtype=numpy.float64)
+        #   Sorted join of the datetimes of the contracted power with the meteorological ones.
+        positions: numpy.ndarray = numpy.minimum(numpy.searchsorted(meteo_datetimes, datetimes),
+                                                 max(len(meteo_datetimes) - 1, 0))
+        found: numpy.ndarray = meteo_datetimes[positions] == datetimes if len(meteo_datetimes) else \
+            numpy.zeros(len(datetimes), dtype=bool)
+        features[:, 1:len(weather_params) + 1] = numpy.nan
+        features[found, 1:len(weather_params) + 1] = weather_values[positions[found]]
+        build_calendar_features(datetimes, holidays, features[:, len(weather_params) + 1:])
+        return DataFrame(features, columns=columns, index=contracted_power.index, copy=False)
 
     def filter_dataframe(self, data: DataFrame, initial_datetime: str, final_datetime: str) -> DataFrame:
         data_filtered: DataFrame = data[data['InitialDatetime'] >= initial_datetime]
         data_filtered: DataFrame = data_filtered[data_filtered['InitialDatetime'] <= final_datetime]
         return data_filtered
 
-    def merge_simulation_data(self, initial_datetime: str, final_datetime: str, time_lapse: float, entities: list):
-        initial_date: str = initial_datetime
-        final_date: str = datetime.strftime(
-            datetime.strptime(initial_date, self.__datetime_format) + timedelta(hours=time_lapse),
-            self.__datetime_format)
-        simulation: DataFrame = DataFrame()
-        while initial_date <= final_datetime:
-            for entity in entities:
-                new_record: DataFrame = DataFrame()
-                if type(entity) == Battery:
-                    new_record = self.__build_battery_data(entity, initial_date, final_date)
-                elif type(entity) == PhotovoltaicPlate:
-                    new_record = self.__build_photovoltaic_plate_data(entity, initial_date, final_date)
-                elif type(entity) == PointOfGridDelivery:
-                    new_record = self.__build_point_of_grid_delivery_data(entity, initial_date, final_date)
-                elif type(entity) == PointOfConsumption:
-                    new_record = self.__build_point_of_consumption(entity, initial_date, final_date)
-                simulation = pandas.concat([simulation, new_record])
-            initial_date = final_date
-            final_date = datetime.strftime(
-                datetime.strptime(initial_date, self.__datetime_format) + timedelta(hours=time_lapse),
-                self.__datetime_format)
-        return simulation
-
-    def calculate_cost(self, simulation: DataFrame, entities: list, time_lapse: float) -> Measurement:
-        cost: Measurement = Measurement(0.0, '€')
-        dates: list = list(set(list(simulation['InitialDatetime'])))
+    def merge_simulation_data(self, clock: SimulationClock, entities: list) -> DataFrame:
+        return SimulationResult(clock, entities).to_dataframe()
+
+    def calculate_cost(self, simulation: DataFrame, entities: list, clock: SimulationClock) -> Measurement:
+        cost_breakdown: CostBreakdown = self.calculate_cost_breakdown(simulation, entities, clock)
+        return Measurement(float(cost_breakdown.get_total()), '€')
+
+    def calculate_cost_breakdown(self, simulation: DataFrame, entities: list,
+                                 clock: SimulationClock) -> CostBreakdown:
+        #   The costs of a simulation in the long format. The simulation results are costed from their arrays by the
+        #   cost engine directly.
         pods: list = list(filter(lambda x: type(x) == PointOfGridDelivery, entities))
-        for pod in pods:
-            pod_consumption: DataFrame = simulation[simulation['EntityId'] == pod.get_id()]
-            for date in dates:
-                purchase_price: Measurement = pod.get_purchase_price(date)
-                sale_price: Measurement = pod.get_sale_price()
-                consumption: float = pod_consumption[pod_consumption['InitialDatetime'] == date][
-                                         'MagnitudeValue'].iloc[0] * time_lapse
-                if consumption >= 0.0:
-                    cost.value += consumption * purchase_price.value
-                else:
-                    cost.value -= consumption * sale_price.value
-        return cost
-
-    def build_images(self, initial_datetime: str, final_datetime: str, time_lapse: float,
-                     standard_simulation: DataFrame, optimized_simulation: DataFrame, purchase_prices: DataFrame,
-                     output_path: str):
-        dates: list = self.__get_dates_list(initial_datetime, final_datetime, time_lapse)
+        pods_power: numpy.ndarray = numpy.zeros((len(clock), len(pods)))
+        steps: Index = Index(clock.get_timestamps()[:-1])
+        for index, pod in enumerate(pods):
+            #   The first record of every datetime is the one costed, and the missing datetimes cost nothing.
+            pod_consumption: DataFrame = simulation[simulation['EntityId'] == pod.get_id()].drop_duplicates(
+                'InitialDatetime')
+            pod_steps: numpy.ndarray = steps.get_indexer(TimeSeries.to_timestamps(pod_consumption['InitialDatetime']))
+            pods_power[pod_steps[pod_steps >= 0], index] = \
+                pod_consumption['MagnitudeValue'].to_numpy(dtype=numpy.float64)[pod_steps >= 0]
+        return CostEngine(clock, pods).calculate(pods_power)
+
+    def build_images(self, clock: SimulationClock, standard_simulation: DataFrame, optimized_simulation: DataFrame,
+                     purchase_prices: DataFrame, output_path: str):
+        time_lapse: float = clock.get_time_lapse()
+        dates: list = clock.get_initial_datetimes()
         self.__build_generation_image(standard_simulation, dates, output_path)
         self.__build_consumption_image(standard_simulation, optimized_simulation, dates, time_lapse, output_path)
         self.__build_batteries_and_prices_image(standard_simulation, optimized_simulation, purchase_prices, dates,
                                                 output_path)
         return
 
-    def __get_dates_list(self, initial_datetime: str, final_datetime: str, time_lapse: float) -> list:
-        initial_date: datetime = datetime.strptime(initial_datetime, self.__datetime_format)
-        final_date: datetime = datetime.strptime(final_datetime, self.__datetime_format)
-        dates: list = [initial_date]
-        count: int = 1
-        while dates[-1] != final_date:
-            dates.append(initial_date + timedelta(hours=time_lapse * count))
-            count += 1
-        dates = [datetime.strftime(date, self.__datetime_format) for date in dates]
-        return dates
-
-    def __build_battery_data(self, battery: Battery, initial_datetime: str, final_datetime: str) -> DataFrame:
-        battery_power: float = list(self.filter_dataframe(battery.flowed_power, initial_datetime,
-                                                          initial_datetime)['MagnitudeValue'])[0]
-        stored_energy: float = list(self.filter_dataframe(battery.stored_energy, initial_datetime,
-                                                          initial_datetime)['MagnitudeValue'])[0]
-        battery_state_of_charge: float = (stored_energy / battery.get_nominal_energy().value) * 100
-        battery_data: dict = {
-            'InitialDatetime': initial_datetime,
-            'FinalDatetime': final_datetime,
-            'EntityId': battery.get_id(),
-            'EntityType': 'battery',
-            'Magnitude': ['power', 'state_of_charge'],
-            'MagnitudeValue': [battery_power, battery_state_of_charge],
-            'MagnitudeUnits': ['kW', '%']
-        }
-        return DataFrame(battery_data)
-
-    def __build_photovoltaic_plate_data(self, pv: PhotovoltaicPlate, initial_datetime: str,
-                                        final_datetime: str) -> DataFrame:
-        pv_power: float = pv.get_generation(initial_datetime).value
-        pv_data: dict = {
-            'InitialDatetime': initial_datetime,
-            'FinalDatetime': final_datetime,
-            'EntityId': pv.get_id(),
-            'EntityType': 'photovoltaic_plate',
-            'Magnitude': ['power'],
-            'MagnitudeValue': [pv_power],
-            'MagnitudeUnits': ['kW']
-        }
-        return DataFrame(pv_data, index=[0])
-
-    def __build_point_of_grid_delivery_data(self, pod: PointOfGridDelivery, initial_datetime: str,
-                                            final_datetime: str) -> DataFrame:
-        pod_power: float = list(self.filter_dataframe(pod.flowed_power, initial_datetime,
-                                                      initial_datetime)['MagnitudeValue'])[0]
-        battery_data: dict = {
-            'InitialDatetime': initial_datetime,
-            'FinalDatetime': final_datetime,
-            'EntityId': pod.get_id(),
-            'EntityType': 'point_of_grid_delivery',
-            'Magnitude': ['power'],
-            'MagnitudeValue': [pod_power],
-            'MagnitudeUnits': ['kW']
-        }
-        return DataFrame(battery_data)
-
-    def __build_point_of_consumption(self, poc: PointOfConsumption, initial_datetime: str,
-                                     final_datetime: str) -> DataFrame:
-        poc_energy: float = poc.get_consumption(initial_datetime).value
-        battery_data: dict = {
-            'InitialDatetime': initial_datetime,
-            'FinalDatetime': final_datetime,
-            'EntityId': poc.get_id(),
-            'EntityType': 'point_of_consumption',
-            'Magnitude': ['energy'],
-            'MagnitudeValue': [poc_energy],
-            'MagnitudeUnits': ['kWh']
-        }
-        return DataFrame(battery_data, index=[0])
+    def __build_meteo_dataframe(self, initial_time: str, final_time: str, weather_values: dict, weather_units: dict,
+                                interpolate: bool) -> DataFrame:
+        #   Every hourly value covers the four quarters of its hour, either held or linearly interpolated towards the
+        #   value of the following hour.
+        initial_date: numpy.datetime64 = numpy.datetime64(
+            datetime.strptime(initial_time, self.__meteo_datetime_format), 'us')
+        final_date: numpy.datetime64 = numpy.datetime64(
+            datetime.strptime(final_time, self.__meteo_datetime_format), 'us')
+        quarter: numpy.timedelta64 = numpy.timedelta64(15, 'm')
+        dates: numpy.ndarray = initial_date + quarter * numpy.arange((final_date - initial_date) // quarter + 4)
+
+        values: list = []
+        for weather_variable in self.__weather_variables:
+            hourly_values: numpy.ndarray = weather_values[weather_variable]
+            if interpolate:
+                values.append(numpy.interp(numpy.arange(4 * len(hourly_values)) / 4, numpy.arange(len(hourly_values)),
+                                           hourly_values.astype(numpy.float64)))
+            else:
+                values.append(numpy.repeat(hourly_values, 4))
+
+        variables: int = len(self.__weather_variables)
+        return DataFrame({
+            'InitialDatetime': numpy.tile(dates, variables),
+            'FinalDatetime': numpy.tile(dates + quarter, variables),
+            'Magnitude': numpy.repeat(numpy.array(self.__weather_variables, dtype=object), len(dates)),
+            'MagnitudeValue': numpy.concatenate(values),
+            'MagnitudeUnits': numpy.repeat(numpy.array([weather_units[weather_variable].replace('Â', '') for
+                                                        weather_variable in self.__weather_variables], dtype=object),
+                                           len(dates))
+        }, index=numpy.tile(numpy.arange(len(dates)), variables))
 
     def __build_generation_image(self, standard_simulation: DataFrame, dates: list, output_path: str):
         pvs_data: DataFrame = standard_simulation[standard_simulation['EntityType'] == 'photovoltaic_plate']
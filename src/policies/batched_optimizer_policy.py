@@ -0,0 +1,169 @@
+import numpy
+
+from src.policies.policy import Policy
+from src.entities.entities_manager import EntitiesManager
+from src.entities.battery_fleet import BatteryFleet
+from src.measurement import Measurement
+from src.simulation_clock import SimulationClock
+from src.policies.horizon_features import HorizonFeatures
+from src.policies.drivers_table import DriversTable, load_drivers_table
+from src.policies.water_filling import water_filling
+
+COEFFICIENTS: list = ['consumption_slope', 'purchase_price_slope', 'consumption_low', 'generation_low',
+                      'purchase_price_low']
+
+
+def build_coefficients_matrix(coefficients: list) -> numpy.ndarray:
+    return numpy.array([[coefficient_set[name] for name in COEFFICIENTS] for coefficient_set in coefficients],
+                       dtype=numpy.float64).reshape(-1, len(COEFFICIENTS))
+
+
+class BatchedOptimizerPolicy(Policy):
+
+    def __init__(self, coefficients: numpy.ndarray, entities_manager: EntitiesManager, drivers: DriversTable = None):
+        super().__init__(entities_manager)
+
+        #   One row per candidate, with the columns sorted as in COEFFICIENTS.
+        self.__coefficients: numpy.ndarray = numpy.atleast_2d(numpy.asarray(coefficients, dtype=numpy.float64))
+
+        self.__drivers: DriversTable = drivers if drivers is not None else load_drivers_table()
+
+        self.__nominal_energy: numpy.ndarray = None
+        self.__max_input_power: numpy.ndarray = None
+        self.__energy: numpy.ndarray = None
+        self.__recorded: numpy.ndarray = None
+        self.__pods_flowed_power: numpy.ndarray = None
+        self.__costs: numpy.ndarray = None
+
+    def get_coefficients(self) -> numpy.ndarray:
+        return self.__coefficients
+
+    def get_costs(self) -> numpy.ndarray:
+        return self.__costs
+
+    def get_energy(self) -> numpy.ndarray:
+        return self.__energy
+
+    def simulate(self, clock: SimulationClock, features: HorizonFeatures = None):
+        #   The features of the horizon can be shared by several policies that simulate the same clock.
+        if features is None:
+            features = HorizonFeatures(self._entities_manager, clock)
+        candidates: int = len(self.__coefficients)
+        batteries: list = self._entities_manager.get_batteries()
+        pods: list = self._entities_manager.get_points_of_grid_delivery()
+
+        fleet: BatteryFleet = self._entities_manager.get_battery_fleet()
+        self.__nominal_energy = fleet.get_nominal_energy()
+        self.__max_input_power = fleet.get_max_input_power()
+        self.__energy = numpy.tile(fleet.get_energy(), (candidates, 1))
+        self.__costs = numpy.zeros(candidates)
+
+        states: numpy.ndarray = features.get_states(self.__coefficients)
+        for step in clock.get_steps():
+            self.__recorded = numpy.zeros((candidates, len(batteries)), dtype=bool)
+            self.__pods_flowed_power = numpy.zeros((candidates, len(pods)))
+            self.__distribute(step, states[:, step], features, pods)
+            self.__update_cost(pods, step, features)
+        return
+
+    def __distribute(self, step: int, state: numpy.ndarray, features: HorizonFeatures, pods: list):
+        time_lapse: float = features.get_time_lapse()
+        consumption: float = features.get_consumption()[step]
+        generation: float = features.get_generation()[step]
+
+        if features.get_surplus()[step]:
+            return self.__send_power(consumption, generation, state, pods, time_lapse)
+
+        return self.__get_power(consumption, generation, state, pods, features.get_max_output_power()[step],
+                                time_lapse)
+
+    def __send_power(self, consumption: float, generation: float, state: numpy.ndarray, pods: list,
+                     time_lapse: float):
+        remaining: numpy.ndarray = numpy.full(len(state), generation - consumption / time_lapse)
+        demanding_batteries: numpy.ndarray = self.__energy < self.__nominal_energy
+
+        charging: numpy.ndarray = self.__drivers.send_to_batteries(state) & demanding_batteries.any(axis=1)
+        not_charged_power: numpy.ndarray = self.__equal_batteries_charging(charging, demanding_batteries, remaining)
+        remaining = numpy.where(charging, remaining - (remaining - not_charged_power), remaining)
+        selling: numpy.ndarray = ~(charging & (remaining == 0.0))
+
+        power_per_pod: numpy.ndarray = remaining / len(pods)
+        for index, pod in enumerate(pods):
+            received_power: numpy.ndarray = numpy.minimum(pod.get_max_input_power().value, power_per_pod)
+            self.__pods_flowed_power[:, index] = numpy.where(
+                selling, self.__pods_flowed_power[:, index] - received_power, self.__pods_flowed_power[:, index])
+            remaining = numpy.where(selling, remaining - received_power, remaining)
+
+        self.__update_batteries(remaining)
+        self.__pods_flowed_power += remaining[:, numpy.newaxis]
+        return
+
+    def __get_power(self, consumption: float, generation: float, state: numpy.ndarray, pods: list,
+                    max_output_power: numpy.ndarray, time_lapse: float):
+        remaining: numpy.ndarray = numpy.full(len(state), consumption / time_lapse - generation)
+        supplying_batteries: numpy.ndarray = numpy.minimum(self.__energy / 0.25, self.__max_input_power) > 0.0
+        demanding_batteries: numpy.ndarray = self.__energy < self.__nominal_energy
+
+        discharging: numpy.ndarray = self.__drivers.get_from_batteries(state) & supplying_batteries.any(axis=1)
+        if discharging.any():
+            supplying: numpy.ndarray = discharging[:, numpy.newaxis] & supplying_batteries
+            available_power: numpy.ndarray = numpy.minimum(self.__energy / 0.25, self.__max_input_power)
+            discharged_power, supplied_power = water_filling(numpy.where(supplying, available_power, 0.0),
+                                                             remaining)
+            for battery in range(self.__energy.shape[1]):
+                self.__update_battery(battery, supplying[:, battery], -discharged_power[:, battery])
+            remaining = numpy.where(discharging, remaining - supplied_power, remaining)
+        buying: numpy.ndarray = ~(discharging & (remaining == 0.0))
+
+        power_per_pod: numpy.ndarray = remaining / len(pods)
+        for index, pod in enumerate(pods):
+            available_power: numpy.ndarray = max_output_power[index] - self.__pods_flowed_power[:, index]
+            supplied_power: numpy.ndarray = numpy.minimum(available_power, power_per_pod)
+            self.__pods_flowed_power[:, index] = numpy.where(
+                buying, self.__pods_flowed_power[:, index] + supplied_power, self.__pods_flowed_power[:, index])
+            remaining = numpy.where(buying, remaining - supplied_power, remaining)
+
+        charging: numpy.ndarray = buying & self.__drivers.charge_from_pods(state) & demanding_batteries.any(axis=1)
+        if charging.any():
+            available_power: numpy.ndarray = numpy.zeros(len(state))
+            for index, pod in enumerate(pods):
+                available_power += max_output_power[index] - self.__pods_flowed_power[:, index]
+            not_charged_power: numpy.ndarray = self.__equal_batteries_charging(charging, demanding_batteries,
+                                                                               available_power)
+            charged_power_per_pod: numpy.ndarray = (available_power - not_charged_power) / len(pods)
+            self.__pods_flowed_power += numpy.where(charging, charged_power_per_pod, 0.0)[:, numpy.newaxis]
+
+        self.__update_batteries(remaining)
+        self.__pods_flowed_power += remaining[:, numpy.newaxis]
+        return
+
+    def __equal_batteries_charging(self, charging: numpy.ndarray, demanding_batteries: numpy.ndarray,
+                                   available_power: numpy.ndarray) -> numpy.ndarray:
+        #   The same water-filling as the scalar policy, solved for every candidate at once.
+        charging = charging & (available_power != 0.0)
+        charged: numpy.ndarray = charging[:, numpy.newaxis] & demanding_batteries
+        capacities: numpy.ndarray = numpy.minimum(self.__nominal_energy / 0.25 - self.__energy / 0.25,
+                                                  self.__max_input_power)
+        charged_power, total_charged_power = water_filling(numpy.where(charged, capacities, 0.0), available_power)
+        for battery in range(self.__energy.shape[1]):
+            self.__update_battery(battery, charged[:, battery], charged_power[:, battery])
+        return numpy.where(charging, available_power - total_charged_power, available_power)
+
+    def __update_batteries(self, power: numpy.ndarray):
+        for battery in range(self.__energy.shape[1]):
+            self.__update_battery(battery, numpy.ones(len(power), dtype=bool), power)
+
+    def __update_battery(self, battery: int, updated: numpy.ndarray, power: numpy.ndarray):
+        #   As in the battery ledger, only the first flow of each step changes the stored energy.
+        first_record: numpy.ndarray = updated & ~self.__recorded[:, battery]
+        self.__energy[:, battery] = numpy.where(first_record, self.__energy[:, battery] + power * 0.25,
+                                                self.__energy[:, battery])
+        self.__recorded[:, battery] |= updated
+
+    def __update_cost(self, pods: list, step: int, features: HorizonFeatures):
+        for index, pod in enumerate(pods):
+            purchase_price: float = features.get_purchase_prices()[step, index]
+            sale_price: Measurement = pod.get_sale_price()
+            consumption: numpy.ndarray = self.__pods_flowed_power[:, index] * features.get_time_lapse()
+            self.__costs = numpy.where(consumption >= 0.0, self.__costs + consumption * purchase_price,
+                                       self.__costs - consumption * sale_price.value)
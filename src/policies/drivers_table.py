@@ -0,0 +1,52 @@
+import os
+import numpy
+import pandas
+from pandas import DataFrame
+
+DRIVERS_PATH: str = os.path.abspath(os.path.join(os.path.dirname(__file__), os.path.pardir, os.path.pardir, 'data',
+                                                 'input', 'drivers.csv'))
+FIELDS: list = ['surplus', 'consumption_rise', 'purchase_price_rise', 'consumption_low', 'generation_low',
+                'purchase_price_low']
+SEND_TO_BATTERIES: int = 1
+CHARGE_FROM_PODS: int = 2
+GET_FROM_BATTERIES: int = 4
+
+#   Compiled tables by path and modification time, shared by every policy of the process.
+_compiled_tables: dict = {}
+
+
+def load_drivers_table(drivers_path: str = DRIVERS_PATH) -> 'DriversTable':
+    drivers_path = os.path.abspath(drivers_path)
+    key: tuple = (drivers_path, os.stat(drivers_path).st_mtime_ns)
+    if key not in _compiled_tables:
+        #   A modified file replaces its previous compilation.
+        for previous_key in [previous_key for previous_key in _compiled_tables if previous_key[0] == drivers_path]:
+            del _compiled_tables[previous_key]
+        _compiled_tables[key] = DriversTable(pandas.read_csv(drivers_path, sep=';'))
+    return _compiled_tables[key]
+
+
+class DriversTable:
+
+    def __init__(self, drivers: DataFrame):
+        #   Each state is encoded as an integer whose most significant bit is the surplus flag, and each entry of the
+        #   table keeps the decisions of its state as a bitmask.
+        weights: numpy.ndarray = 1 << numpy.arange(len(FIELDS) - 1, -1, -1)
+        codes: numpy.ndarray = drivers[FIELDS].to_numpy(dtype=numpy.int64) @ weights
+        self.__decisions: numpy.ndarray = numpy.zeros(1 << len(FIELDS), dtype=numpy.uint8)
+        for column, decision in [('send_to_batteries', SEND_TO_BATTERIES), ('charge_from_pods', CHARGE_FROM_PODS),
+                                 ('get_from_batteries', GET_FROM_BATTERIES)]:
+            self.__decisions[codes[drivers[column].to_numpy() == 1]] |= decision
+        self.__decisions.flags.writeable = False
+
+    def get_decisions(self) -> numpy.ndarray:
+        return self.__decisions
+
+    def send_to_batteries(self, states):
+        return self.__decisions[states] & SEND_TO_BATTERIES != 0
+
+    def charge_from_pods(self, states):
+        return self.__decisions[states] & CHARGE_FROM_PODS != 0
+
+    def get_from_batteries(self, states):
+        return self.__decisions[states] & GET_FROM_BATTERIES != 0
@@ -0,0 +1,145 @@
+import time
+import numpy
+
+from src.policies.policy import Policy
+from src.entities.entities_manager import EntitiesManager
+from src.entities.battery_fleet import BatteryFleet
+from src.measurement import Measurement
+from src.simulation_clock import SimulationClock
+from src.policies.horizon_features import HorizonFeatures
+
+
+class DynamicProgrammingPolicy(Policy):
+
+    def __init__(self, entities_manager: EntitiesManager, levels: int = 101):
+        super().__init__(entities_manager)
+        #   Number of points of the grid of stored energy of the batteries, which trades accuracy for solve time.
+        self.__levels: int = levels
+        self.__energy_levels: numpy.ndarray = None
+        self.__values: numpy.ndarray = None
+        self.__solve_time: float = None
+        self.__initial_energy: float = None
+
+    def get_levels(self) -> int:
+        return self.__levels
+
+    def get_values(self) -> numpy.ndarray:
+        #   The minimum cost until the end of the horizon, with one row per step plus the final one and one column per
+        #   level of stored energy.
+        return self.__values
+
+    def get_expected_cost(self) -> float:
+        #   The cost of the horizon that the grid of stored energy estimates for the initial state of the batteries.
+        return float(numpy.interp(self.__initial_energy, self.__energy_levels, self.__values[0]))
+
+    def get_solve_time(self) -> float:
+        return self.__solve_time
+
+    def simulate(self, clock: SimulationClock, features: HorizonFeatures = None):
+        if features is None:
+            features = HorizonFeatures(self._entities_manager, clock)
+        batteries: list = self._entities_manager.get_batteries()
+        pods: list = self._entities_manager.get_points_of_grid_delivery()
+
+        fleet: BatteryFleet = self._entities_manager.get_battery_fleet()
+        self.__initial_energy = float(fleet.get_energy().sum())
+        start: float = time.perf_counter()
+        self.__solve(features, fleet, pods)
+        self.__solve_time = time.perf_counter() - start
+        print('The dynamic programming policy has been solved in:', round(self.__solve_time, 3), 's')
+
+        for step in clock.get_steps():
+            self.__distribute(step, features, fleet, batteries, pods)
+        return
+
+    def _step_costs(self, step: int, pods_power: numpy.ndarray, features: HorizonFeatures, pods: list) -> tuple:
+        #   Cost of every net power flowed by the points of grid delivery, which supply and receive it in order up to
+        #   their limits, with the semantics of the cost engine. The power that the points cannot supply makes the
+        #   charging of the batteries infeasible. Override it to use other tariffs.
+        time_lapse: float = features.get_time_lapse()
+        costs: numpy.ndarray = numpy.zeros(pods_power.shape)
+        supplied: numpy.ndarray = numpy.maximum(pods_power, 0.0)
+        received: numpy.ndarray = numpy.maximum(-pods_power, 0.0)
+        for index, pod in enumerate(pods):
+            supply: numpy.ndarray = numpy.minimum(supplied, max(float(features.get_max_output_power()[step, index]),
+                                                                0.0))
+            receive: numpy.ndarray = numpy.minimum(received, pod.get_max_input_power().value)
+            costs += (supply * features.get_purchase_prices()[step, index] +
+                      receive * pod.get_sale_price().value) * time_lapse
+            supplied = supplied - supply
+            received = received - receive
+        return costs, supplied > 0.0
+
+    def __solve(self, features: HorizonFeatures, fleet: BatteryFleet, pods: list):
+        #   The batteries are solved as a fleet, whose stored energy is shared in proportion to their nominal energy.
+        time_lapse: float = features.get_time_lapse()
+        nominal_energy: numpy.ndarray = fleet.get_nominal_energy()
+        max_input_power: numpy.ndarray = fleet.get_max_input_power()
+        self.__energy_levels = numpy.linspace(0.0, nominal_energy.sum(), self.__levels)
+        shares: numpy.ndarray = self.__energy_levels[:, numpy.newaxis] * nominal_energy / nominal_energy.sum()
+        charge: numpy.ndarray = numpy.minimum(nominal_energy - shares, max_input_power * time_lapse).sum(axis=1)
+        discharge_limit: numpy.ndarray = numpy.minimum(shares / time_lapse, max_input_power).sum(axis=1)
+
+        steps: int = len(features)
+        deficit: numpy.ndarray = features.get_consumption() / time_lapse - features.get_generation()
+        self.__values = numpy.zeros((steps + 1, self.__levels))
+        for step in range(steps - 1, -1, -1):
+            energy_change: numpy.ndarray = self.__energy_changes(self.__energy_levels, charge, discharge_limit,
+                                                                 float(deficit[step]), time_lapse)
+            costs, infeasible = self._step_costs(step, deficit[step] + energy_change / time_lapse, features, pods)
+            costs[infeasible] = numpy.inf
+            future: numpy.ndarray = numpy.interp(self.__energy_levels[:, numpy.newaxis] + energy_change,
+                                                 self.__energy_levels, self.__values[step + 1])
+            self.__values[step] = numpy.nanmin(costs + future, axis=1)
+
+    def __energy_changes(self, energy: numpy.ndarray, charge: numpy.ndarray, discharge_limit: numpy.ndarray,
+                         deficit: float, time_lapse: float) -> numpy.ndarray:
+        #   The actions of every state are to stay idle, to charge as much as the batteries can, to charge the surplus
+        #   of the step, to discharge the deficit of the step, or to charge or discharge up to every other level of the
+        #   grid. The unreachable levels are NaN.
+        energy = numpy.atleast_1d(energy)[:, numpy.newaxis]
+        charge = numpy.atleast_1d(charge)
+        discharge_limit = numpy.atleast_1d(discharge_limit)[:, numpy.newaxis] * time_lapse
+        to_levels: numpy.ndarray = self.__energy_levels - energy
+        to_levels[(to_levels == 0.0) | (to_levels > charge[:, numpy.newaxis]) | (-to_levels > discharge_limit)] = \
+            numpy.nan
+        return numpy.column_stack([numpy.zeros(len(energy)), charge,
+                                   numpy.minimum(charge, max(-deficit, 0.0) * time_lapse),
+                                   -numpy.minimum(discharge_limit[:, 0], max(deficit, 0.0) * time_lapse), to_levels])
+
+    def __distribute(self, step: int, features: HorizonFeatures, fleet: BatteryFleet, batteries: list, pods: list):
+        #   Take the action of minimum cost from the actual state of the batteries, with the values of the grid for
+        #   the following steps.
+        time_lapse: float = features.get_time_lapse()
+        deficit: float = float(features.get_consumption()[step] / time_lapse - features.get_generation()[step])
+        energy: float = float(fleet.get_energy().sum())
+        charge: float = float(numpy.minimum(fleet.get_nominal_energy() - fleet.get_energy(),
+                                            fleet.get_max_input_power() * time_lapse).sum())
+        discharge_limit: float = float(fleet.get_available_power().sum())
+        energy_change: numpy.ndarray = self.__energy_changes(numpy.array([energy]), charge, discharge_limit, deficit,
+                                                             time_lapse)[0]
+        costs, infeasible = self._step_costs(step, deficit + energy_change / time_lapse, features, pods)
+        costs[infeasible] = numpy.inf
+        total: numpy.ndarray = costs + numpy.interp(energy + energy_change, self.__energy_levels,
+                                                    self.__values[step + 1])
+        action: int = int(numpy.nanargmin(total))
+
+        #   The power of the action is shared among the batteries with the same equal allocations as the other
+        #   policies, and the batteries that do not take part record no flow in the step.
+        power: Measurement = Measurement(abs(float(energy_change[action])) / time_lapse, 'kW')
+        battery_power: float = 0.0
+        if energy_change[action] > 0.0:
+            demanding_batteries: list = self._entities_manager.get_demanding_batteries(batteries)
+            battery_power = power.value - self._equal_batteries_charging(demanding_batteries, power, step).value
+        elif energy_change[action] < 0.0:
+            supplying_batteries: list = self._entities_manager.get_supplying_batteries(batteries)
+            battery_power = -self._equal_batteries_discharging(supplying_batteries, power, step).value
+        [battery.update_flowed_power(step, Measurement(0.0, 'kW')) for battery in batteries]
+
+        remaining: Measurement = Measurement(deficit + battery_power, 'kW')
+        for pod in pods:
+            if remaining.value >= 0.0:
+                remaining.value -= pod.supply_power(step, remaining).value
+            else:
+                remaining.value += pod.receive_power(step, Measurement(-remaining.value, 'kW')).value
+        return
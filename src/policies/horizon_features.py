@@ -0,0 +1,102 @@
+import numpy
+from pandas import DataFrame
+
+from src.entities.entities_manager import EntitiesManager
+from src.simulation_clock import SimulationClock
+
+
+class HorizonFeatures:
+
+    def __init__(self, entities_manager: EntitiesManager, clock: SimulationClock):
+        entities_manager.set_clock(clock)
+        pvs: list = entities_manager.get_photovoltaic_plates()
+        pods: list = entities_manager.get_points_of_grid_delivery()
+        pocs: list = entities_manager.get_points_of_consumption()
+        self.__time_lapse: float = clock.get_time_lapse()
+
+        #   The slopes compare every step with the following one, so the values of one more step are read. The
+        #   series of every entity are read as arrays aligned with the steps, and summed entity by entity.
+        steps: int = len(clock)
+        consumption: numpy.ndarray = numpy.zeros(steps + 1, dtype=numpy.float64)
+        for poc in pocs:
+            consumption += poc.get_consumption_values(steps + 1)
+        generation: numpy.ndarray = numpy.zeros(steps, dtype=numpy.float64)
+        for pv in pvs:
+            generation += pv.get_generation_values(steps)
+        purchase_prices: numpy.ndarray = numpy.column_stack(
+            [pod.get_purchase_price_values(steps + 1) for pod in pods]).reshape(-1, len(pods))
+
+        self.__consumption: numpy.ndarray = consumption[:-1]
+        self.__generation: numpy.ndarray = generation
+        #   The policies take the purchase price of the first point of grid delivery as reference.
+        self.__purchase_prices: numpy.ndarray = purchase_prices[:-1]
+        self.__max_output_power: numpy.ndarray = numpy.column_stack(
+            [pod.available_power_values(steps) for pod in pods]).reshape(-1, len(pods))
+
+        self.__surplus: numpy.ndarray = generation - self.__consumption / self.__time_lapse >= 0.0
+        self.__consumption_slope: numpy.ndarray = self.__slopes(consumption)
+        self.__purchase_price_slope: numpy.ndarray = self.__slopes(purchase_prices[:, 0])
+        self.__relative_consumption: numpy.ndarray = self.__relative(
+            self.__consumption, pocs[0].get_all_consumption())
+        self.__relative_generation: numpy.ndarray = self.__relative(generation, pvs[0].get_all_generation())
+        self.__relative_purchase_price: numpy.ndarray = self.__relative(
+            self.__purchase_prices[:, 0], pods[0].get_all_purchase_prices())
+
+    def __len__(self) -> int:
+        return len(self.__consumption)
+
+    def get_time_lapse(self) -> float:
+        return self.__time_lapse
+
+    def get_consumption(self) -> numpy.ndarray:
+        return self.__consumption
+
+    def get_generation(self) -> numpy.ndarray:
+        return self.__generation
+
+    def get_purchase_prices(self) -> numpy.ndarray:
+        return self.__purchase_prices
+
+    def get_max_output_power(self) -> numpy.ndarray:
+        return self.__max_output_power
+
+    def get_surplus(self) -> numpy.ndarray:
+        return self.__surplus
+
+    def get_thresholds(self) -> numpy.ndarray:
+        #   The values compared with the coefficients of the optimizer policy, one column per coefficient.
+        return numpy.column_stack([self.__consumption_slope, self.__purchase_price_slope,
+                                   self.__relative_consumption, self.__relative_generation,
+                                   self.__relative_purchase_price])
+
+    def get_states(self, coefficients: numpy.ndarray) -> numpy.ndarray:
+        #   Each state is encoded as an integer whose most significant bit is the surplus flag, with one row per
+        #   candidate and one column per step.
+        coefficients = numpy.atleast_2d(coefficients)[:, :, numpy.newaxis]
+        flags: list = [
+            numpy.broadcast_to(self.__surplus, (len(coefficients), len(self))),
+            self.__consumption_slope >= coefficients[:, 0],
+            self.__purchase_price_slope >= coefficients[:, 1],
+            self.__relative_consumption < coefficients[:, 2],
+            self.__relative_generation < coefficients[:, 3],
+            self.__relative_purchase_price < coefficients[:, 4],
+        ]
+        states: numpy.ndarray = numpy.zeros((len(coefficients), len(self)), dtype=numpy.int64)
+        for flag in flags:
+            states = (states << 1) | flag
+        return states
+
+    def __slopes(self, values: numpy.ndarray) -> numpy.ndarray:
+        #   The logarithmic slope of every value towards the following one, or the signed value that is not zero when
+        #   the other one is.
+        k: float = 0.72134752
+        current: numpy.ndarray = values[:-1]
+        following: numpy.ndarray = values[1:]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            slopes: numpy.ndarray = k * numpy.log(current / following) + 0.5
+        return numpy.where(current == 0.0, following, numpy.where(following == 0.0, -current, slopes))
+
+    def __relative(self, values: numpy.ndarray, series: DataFrame) -> numpy.ndarray:
+        lowest: float = float(series['MagnitudeValue'].min())
+        highest: float = float(series['MagnitudeValue'].max())
+        return (values - lowest) / (highest - lowest)
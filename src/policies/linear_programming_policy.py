@@ -0,0 +1,168 @@
+import numpy
+from scipy import sparse
+from scipy.optimize import linprog, OptimizeResult
+
+from src.policies.policy import Policy
+from src.entities.entities_manager import EntitiesManager
+from src.entities.battery_fleet import BatteryFleet
+from src.measurement import Measurement
+from src.simulation_clock import SimulationClock
+from src.policies.horizon_features import HorizonFeatures
+
+#   Price of the consumption left unserved, in €/kWh. It is far above any purchase price, so the consumption is only
+#   left unserved when the batteries and the points of grid delivery cannot supply it.
+UNSERVED_ENERGY_PRICE: float = 10.0
+#   Price of the curtailed generation, in €/kWh. It is far above any sale price, so the surplus is only curtailed when
+#   the batteries and the points of grid delivery cannot take it, and the dispatch is the same as without the slack
+#   whenever that one is feasible.
+CURTAILMENT_PRICE: float = 1.0
+
+
+class LinearProgrammingPolicy(Policy):
+
+    def __init__(self, entities_manager: EntitiesManager, tolerance: float = 1e-9,
+                 unserved_energy_price: float = UNSERVED_ENERGY_PRICE, curtailment_price: float = CURTAILMENT_PRICE):
+        super().__init__(entities_manager)
+        #   The slacks keep the program feasible whatever the inputs are, as the other policies drop the power beyond
+        #   the limits of the entities. Their prices only steer the solver, and are not part of the cost.
+        self.__unserved_energy_price: float = unserved_energy_price
+        self.__curtailment_price: float = curtailment_price
+        #   The flows below the tolerance are numerical noise of the solver, and are recorded as zero.
+        self.__tolerance: float = tolerance
+        self.__cost: float = None
+        self.__batteries_power: numpy.ndarray = None
+        self.__pods_power: numpy.ndarray = None
+        self.__curtailed_power: numpy.ndarray = None
+        self.__unserved_power: numpy.ndarray = None
+
+    def get_cost(self) -> float:
+        #   The optimal cost of the horizon, with the semantics of the cost engine.
+        return self.__cost
+
+    def get_batteries_power(self) -> numpy.ndarray:
+        return self.__batteries_power
+
+    def get_pods_power(self) -> numpy.ndarray:
+        return self.__pods_power
+
+    def get_curtailed_power(self) -> numpy.ndarray:
+        #   The generation of every step that could not be charged or sold.
+        return self.__curtailed_power
+
+    def get_unserved_power(self) -> numpy.ndarray:
+        #   The consumption of every step that could not be supplied, as power.
+        return self.__unserved_power
+
+    def simulate(self, clock: SimulationClock, features: HorizonFeatures = None):
+        if features is None:
+            features = HorizonFeatures(self._entities_manager, clock)
+        batteries: list = self._entities_manager.get_batteries()
+        pods: list = self._entities_manager.get_points_of_grid_delivery()
+        pvs: list = self._entities_manager.get_photovoltaic_plates()
+
+        result: OptimizeResult = self.__solve(features, batteries, pods)
+        if not result.success:
+            raise ValueError('The dispatch linear program has no solution: ' + result.message)
+
+        #   The variables are the charged, discharged, purchased and sold powers, the stored energies, and the
+        #   curtailed and unserved powers, in blocks of one row per step.
+        steps: int = len(features)
+        charged, discharged, purchased, sold, _, curtailed, unserved = self.__split(
+            self.__clean(result.x), steps, len(batteries), len(pods))
+        self.__batteries_power = charged - discharged
+        self.__pods_power = purchased - sold
+        self.__curtailed_power = curtailed[:, 0]
+        self.__unserved_power = unserved[:, 0]
+        self.__cost = float(result.fun) - features.get_time_lapse() * (
+            self.__curtailment_price * self.__curtailed_power.sum() +
+            self.__unserved_energy_price * self.__unserved_power.sum())
+
+        #   The curtailed power is shared among the plates in proportion to their generation.
+        generations: numpy.ndarray = numpy.column_stack(
+            [pv.get_generation_values(steps) for pv in pvs]).reshape(steps, len(pvs))
+        total_generation: numpy.ndarray = generations.sum(axis=1, keepdims=True)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            curtailments: numpy.ndarray = numpy.where(
+                total_generation > 0.0, generations / total_generation, 0.0) * self.__curtailed_power[:, numpy.newaxis]
+        for step in clock.get_steps():
+            [battery.update_flowed_power(step, Measurement(float(self.__batteries_power[step, index]),
+                                                           battery.get_max_input_power().units))
+             for index, battery in enumerate(batteries)]
+            [pod.update_flowed_power(step, Measurement(float(self.__pods_power[step, index]),
+                                                       pod.get_max_input_power().units))
+             for index, pod in enumerate(pods)]
+            [pv.curtail(step, Measurement(float(curtailments[step, index]), pv.get_max_output_power().units))
+             for index, pv in enumerate(pvs) if curtailments[step, index] > 0.0]
+        return
+
+    def __solve(self, features: HorizonFeatures, batteries: list, pods: list) -> OptimizeResult:
+        steps: int = len(features)
+        time_lapse: float = features.get_time_lapse()
+        fleet: BatteryFleet = self._entities_manager.get_battery_fleet()
+        battery_count: int = len(batteries)
+        pod_count: int = len(pods)
+        battery_variables: int = steps * battery_count
+        pod_variables: int = steps * pod_count
+        offsets: numpy.ndarray = numpy.cumsum([0, battery_variables, battery_variables, pod_variables, pod_variables,
+                                               battery_variables, steps, steps])
+        variables: int = offsets[-1]
+
+        #   The purchased energy costs its price and, as in the cost engine, the sold energy adds its sale price.
+        sale_prices: numpy.ndarray = numpy.array([pod.get_sale_price().value for pod in pods], dtype=numpy.float64)
+        cost: numpy.ndarray = numpy.zeros(variables)
+        cost[offsets[2]:offsets[3]] = features.get_purchase_prices().reshape(-1) * time_lapse
+        cost[offsets[3]:offsets[4]] = numpy.tile(sale_prices, steps) * time_lapse
+        cost[offsets[5]:offsets[6]] = self.__curtailment_price * time_lapse
+        cost[offsets[6]:offsets[7]] = self.__unserved_energy_price * time_lapse
+
+        #   Power balance of every step: the grid and the batteries supply the consumption not covered by the
+        #   generation, less the curtailed generation and the unserved consumption.
+        battery_steps: numpy.ndarray = numpy.repeat(numpy.arange(steps), battery_count)
+        pod_steps: numpy.ndarray = numpy.repeat(numpy.arange(steps), pod_count)
+        balance: sparse.csr_matrix = sparse.csr_matrix(
+            (numpy.concatenate([-numpy.ones(battery_variables), numpy.ones(battery_variables),
+                                numpy.ones(pod_variables), -numpy.ones(pod_variables), -numpy.ones(steps),
+                                numpy.ones(steps)]),
+             (numpy.concatenate([battery_steps, battery_steps, pod_steps, pod_steps, numpy.arange(steps),
+                                 numpy.arange(steps)]),
+              numpy.concatenate([numpy.arange(offsets[4]), numpy.arange(offsets[5], offsets[7])]))),
+            shape=(steps, variables))
+        balance_target: numpy.ndarray = features.get_consumption() / time_lapse - features.get_generation()
+
+        #   Energy balance of every battery: the stored energy of a step is the previous one plus the charged energy
+        #   minus the discharged one.
+        rows: numpy.ndarray = numpy.arange(battery_variables)
+        previous: numpy.ndarray = rows[battery_count:]
+        energy: sparse.csr_matrix = sparse.csr_matrix(
+            (numpy.concatenate([numpy.full(battery_variables, -time_lapse), numpy.full(battery_variables, time_lapse),
+                                numpy.ones(battery_variables), -numpy.ones(len(previous))]),
+             (numpy.concatenate([rows, rows, rows, previous]),
+              numpy.concatenate([offsets[0] + rows, offsets[1] + rows, offsets[4] + rows,
+                                 offsets[4] + previous - battery_count]))), shape=(battery_variables, variables))
+        energy_target: numpy.ndarray = numpy.zeros(battery_variables)
+        energy_target[:battery_count] = fleet.get_energy()
+
+        #   The powers are limited by the batteries and the points of grid delivery, and the stored energy by the
+        #   nominal energy. At most the whole generation is curtailed, and the whole consumption unserved, so the
+        #   slacks alone always balance a step.
+        max_output_power: numpy.ndarray = numpy.nan_to_num(features.get_max_output_power(), nan=0.0)
+        upper_bounds: numpy.ndarray = numpy.concatenate([
+            numpy.tile(fleet.get_max_input_power(), steps),
+            numpy.tile(fleet.get_max_output_power(), steps),
+            numpy.maximum(max_output_power.reshape(-1), 0.0),
+            numpy.tile([pod.get_max_input_power().value for pod in pods], steps),
+            numpy.tile(fleet.get_nominal_energy(), steps),
+            numpy.maximum(features.get_generation(), 0.0),
+            numpy.maximum(features.get_consumption() / time_lapse, 0.0)])
+        bounds: numpy.ndarray = numpy.column_stack([numpy.zeros(variables), upper_bounds])
+
+        return linprog(cost, A_eq=sparse.vstack([balance, energy]).tocsr(),
+                       b_eq=numpy.concatenate([balance_target, energy_target]), bounds=bounds, method='highs')
+
+    def __split(self, solution: numpy.ndarray, steps: int, battery_count: int, pod_count: int) -> list:
+        sizes: list = [battery_count, battery_count, pod_count, pod_count, battery_count, 1, 1]
+        offsets: numpy.ndarray = numpy.cumsum([0] + [steps * size for size in sizes])
+        return [solution[offsets[index]:offsets[index + 1]].reshape(steps, size) for index, size in enumerate(sizes)]
+
+    def __clean(self, solution: numpy.ndarray) -> numpy.ndarray:
+        return numpy.where(numpy.abs(solution) < self.__tolerance, 0.0, solution)
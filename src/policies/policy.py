@@ -1,46 +1,52 @@
+import numpy
+
 from src.measurement import Measurement
 from src.entities.entities_manager import EntitiesManager
+from src.entities.battery_fleet import BatteryFleet
+from src.policies.water_filling import water_filling
 
 
 class Policy:
 
     def __init__(self, entities_manager: EntitiesManager):
         self._entities_manager: EntitiesManager = entities_manager
-        self._datetime_format: str = '%Y-%m-%d %H:%M:%S'
 
-    def _generation(self, pvs: list, initial_datetime: str) -> Measurement:
+    def _generation(self, pvs: list, step: int) -> Measurement:
         generation: Measurement = Measurement(0, 'kW')
         for pv in pvs:
-            generation.value += pv.get_generation(initial_datetime).value
+            generation.value += pv.get_generation(step).value
         return generation
 
-    def _consumption(self, pocs: list, initial_datetime: str) -> Measurement:
+    def _consumption(self, pocs: list, step: int) -> Measurement:
         consumption: Measurement = Measurement(0, 'kWh')
         for poc in pocs:
-            consumption.value += poc.get_consumption(initial_datetime).value
+            consumption.value += poc.get_consumption(step).value
         return consumption
 
-    def _purchase_price(self, pods: list, initial_datetime: str) -> Measurement:
-        return Measurement(pods[0].get_purchase_price(initial_datetime).value, '€/kWh')
+    def _purchase_price(self, pods: list, step: int) -> Measurement:
+        return Measurement(pods[0].get_purchase_price(step).value, '€/kWh')
 
     def _equal_batteries_charging(self, demanding_batteries: list, available_power: Measurement,
-                                  previous_charged_power: Measurement, initial_datetime: str,
-                                  final_datetime: str) -> Measurement:
+                                  step: int) -> Measurement:
+        #   The batteries take equal shares of the power up to their vacant or maximum input power, and return the
+        #   power that has not been charged.
         if len(demanding_batteries) == 0 or available_power.value == 0.0:
             return available_power
-        power: Measurement = Measurement(available_power.value, available_power.units)
-        still_demanding_batteries: list = demanding_batteries.copy()
-        power_to_charge: Measurement = Measurement(power.value / len(demanding_batteries), power.units)
-        for battery in demanding_batteries:
-            vacant_power: Measurement = Measurement(
-                (battery.get_nominal_energy().value - battery.energy.value) / 0.25,
-                power.units)
-            max_input_power: Measurement = Measurement(
-                battery.get_max_input_power().value - previous_charged_power.value, power.units)
-            charged_power: Measurement = battery.charge(initial_datetime, final_datetime, power_to_charge)
-            power.value -= charged_power.value
-            if charged_power.value == vacant_power.value or charged_power.value == max_input_power.value:
-                still_demanding_batteries.remove(battery)
-        power = self._equal_batteries_charging(still_demanding_batteries, power, power_to_charge, initial_datetime,
-                                               final_datetime)
-        return power
+        fleet: BatteryFleet = self._entities_manager.get_battery_fleet()
+        capacities: numpy.ndarray = fleet.get_headroom()[fleet.get_indices(demanding_batteries)]
+        allocations, charged_power = water_filling(capacities, available_power.value)
+        for battery, allocation in zip(demanding_batteries, allocations):
+            battery.charge(step, Measurement(float(allocation), available_power.units))
+        return Measurement(available_power.value - float(charged_power), available_power.units)
+
+    def _equal_batteries_discharging(self, supplying_batteries: list, power: Measurement, step: int) -> Measurement:
+        #   The batteries supply equal shares of the power up to their available power, and return the power that
+        #   they have supplied.
+        if len(supplying_batteries) == 0:
+            return Measurement(0.0, power.units)
+        fleet: BatteryFleet = self._entities_manager.get_battery_fleet()
+        capacities: numpy.ndarray = fleet.get_available_power()[fleet.get_indices(supplying_batteries)]
+        allocations, supplied_power = water_filling(capacities, power.value)
+        for battery, allocation in zip(supplying_batteries, allocations):
+            battery.discharge(step, Measurement(float(allocation), power.units))
+        return Measurement(float(supplied_power), power.units)
@@ -0,0 +1,27 @@
+import numpy
+
+
+def water_filling(capacities: numpy.ndarray, power) -> tuple:
+    #   Share the power equally among the units, the share of the ones that reach their capacity being spread over
+    #   the rest. The last axis of the capacities has one column per unit, and any leading axes are solved at once with
+    #   one power each. Return the allocation of every unit and the power allocated in total.
+    capacities = numpy.asarray(capacities, dtype=numpy.float64)
+    power = numpy.maximum(numpy.asarray(power, dtype=numpy.float64), 0.0)
+    units: int = capacities.shape[-1]
+    total: numpy.ndarray = capacities.sum(axis=-1)
+    if units == 0:
+        return capacities.copy(), numpy.zeros_like(power)
+
+    #   With the capacities sorted, the level of the equal share when the k smallest units are full is the remaining
+    #   power over the other units, and the level of the allocation is the first one that fits in its unit.
+    ordered: numpy.ndarray = numpy.sort(capacities, axis=-1)
+    filled: numpy.ndarray = numpy.cumsum(ordered, axis=-1) - ordered
+    levels: numpy.ndarray = (power[..., numpy.newaxis] - filled) / numpy.arange(units, 0, -1)
+    fits: numpy.ndarray = levels <= ordered
+    first: numpy.ndarray = numpy.argmax(fits, axis=-1)
+    level: numpy.ndarray = numpy.where(fits.any(axis=-1),
+                                       numpy.take_along_axis(levels, first[..., numpy.newaxis], axis=-1)[..., 0],
+                                       numpy.inf)
+    allocations: numpy.ndarray = numpy.minimum(capacities, level[..., numpy.newaxis])
+    #   The power is allocated exactly unless every unit is full.
+    return allocations, numpy.where(power < total, power, total)
@@ -0,0 +1,59 @@
+from datetime import timedelta
+
+import numpy
+import pandas
+from pandas import DatetimeIndex
+
+
+class SimulationClock:
+
+    def __init__(self, initial_datetime: str, final_datetime: str, time_lapse: float):
+        self.__datetime_format: str = '%Y-%m-%d %H:%M:%S'
+        self.__time_lapse: float = time_lapse
+        frequency: timedelta = timedelta(hours=time_lapse)
+        #   The steps are the dates from the initial datetime until the final one, both included.
+        self.__steps: int = len(pandas.date_range(initial_datetime, final_datetime, freq=frequency))
+        #   Keep one extra boundary, so the final datetime of the last step and its following values are reachable.
+        self.__boundaries: DatetimeIndex = pandas.date_range(initial_datetime, periods=self.__steps + 1,
+                                                             freq=frequency)
+        self.__labels: list = None
+        self.__label_steps: dict = None
+
+    def __len__(self) -> int:
+        return self.__steps
+
+    def get_time_lapse(self) -> float:
+        return self.__time_lapse
+
+    def get_steps(self) -> range:
+        return range(self.__steps)
+
+    def get_timestamps(self) -> numpy.ndarray:
+        return self.__boundaries.to_numpy()
+
+    def get_initial_datetime(self, step: int) -> str:
+        return self.__get_labels()[step]
+
+    def get_final_datetime(self, step: int) -> str:
+        return self.__get_labels()[step + 1]
+
+    def get_initial_datetimes(self) -> list:
+        return self.__get_labels()[:-1]
+
+    def get_final_datetimes(self) -> list:
+        return self.__get_labels()[1:]
+
+    def get_horizon(self, steps: int) -> 'SimulationClock':
+        return SimulationClock(str(self.__boundaries[0]), str(self.__boundaries[min(steps, self.__steps) - 1]),
+                               self.__time_lapse)
+
+    def get_step(self, initial_datetime: str) -> int:
+        if self.__label_steps is None:
+            self.__label_steps = {label: step for step, label in enumerate(self.__get_labels())}
+        return self.__label_steps[initial_datetime]
+
+    def __get_labels(self) -> list:
+        #   The dates are only formatted once, the first time that a text representation is requested.
+        if self.__labels is None:
+            self.__labels = list(self.__boundaries.strftime(self.__datetime_format))
+        return self.__labels
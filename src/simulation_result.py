@@ -0,0 +1,107 @@
+import numpy
+import pandas
+from pandas import DataFrame
+
+from src.entities.battery import Battery
+from src.entities.photovoltaic_plate import PhotovoltaicPlate
+from src.entities.point_of_grid_delivery import PointOfGridDelivery
+from src.entities.point_of_consumption import PointOfConsumption
+from src.simulation_clock import SimulationClock
+
+
+class SimulationResult:
+
+    def __init__(self, clock: SimulationClock, entities: list):
+        self.__clock: SimulationClock = clock
+        #   One column per magnitude of every entity, with the entities and their magnitudes in the simulation order.
+        columns: list = []
+        values: list = []
+        for entity in entities:
+            if type(entity) == Battery:
+                entity_columns, entity_values = self.__build_battery_data(entity)
+            elif type(entity) == PhotovoltaicPlate:
+                entity_columns, entity_values = self.__build_photovoltaic_plate_data(entity)
+            elif type(entity) == PointOfGridDelivery:
+                entity_columns, entity_values = self.__build_point_of_grid_delivery_data(entity)
+            elif type(entity) == PointOfConsumption:
+                entity_columns, entity_values = self.__build_point_of_consumption(entity)
+            else:
+                continue
+            columns += [(entity.get_id(), entity_type, magnitude, units, position)
+                        for position, (entity_type, magnitude, units) in enumerate(entity_columns)]
+            values += entity_values
+        self.__columns: DataFrame = DataFrame(
+            columns, columns=['EntityId', 'EntityType', 'Magnitude', 'MagnitudeUnits', 'Position'])
+        self.__values: numpy.ndarray = numpy.column_stack(values) if values else numpy.zeros((len(clock), 0))
+        self.__dataframe: DataFrame = None
+
+    def get_clock(self) -> SimulationClock:
+        return self.__clock
+
+    def get_columns(self) -> DataFrame:
+        return self.__columns
+
+    def get_values(self) -> numpy.ndarray:
+        #   One row per step and one column per magnitude of every entity.
+        return self.__values
+
+    def get_series(self, entity_id: str, magnitude: str) -> numpy.ndarray:
+        selected: numpy.ndarray = numpy.flatnonzero((self.__columns['EntityId'] == entity_id).to_numpy() &
+                                                    (self.__columns['Magnitude'] == magnitude).to_numpy())
+        return self.__values[:, selected[0]]
+
+    def get_pods_power(self, pods: list) -> numpy.ndarray:
+        #   The power flowed by the given points of grid delivery, with one row per step and one column per point, as
+        #   the cost engine takes it.
+        power_columns: DataFrame = self.__columns[
+            (self.__columns['EntityType'] == 'point_of_grid_delivery').to_numpy() &
+            (self.__columns['Magnitude'] == 'power').to_numpy()]
+        positions: dict = dict(zip(power_columns['EntityId'], power_columns.index))
+        return self.__values[:, [positions[pod.get_id()] for pod in pods]]
+
+    def to_dataframe(self) -> DataFrame:
+        #   The long format view, with one row per step, entity and magnitude, is only built when it is requested.
+        if self.__dataframe is None:
+            steps: int = len(self.__clock)
+            columns: int = len(self.__columns)
+            self.__dataframe = DataFrame({
+                'InitialDatetime': numpy.repeat(numpy.array(self.__clock.get_initial_datetimes(), dtype=object),
+                                                columns),
+                'FinalDatetime': numpy.repeat(numpy.array(self.__clock.get_final_datetimes(), dtype=object), columns),
+                'EntityId': self.__tile('EntityId', steps),
+                'EntityType': self.__tile('EntityType', steps),
+                'Magnitude': self.__tile('Magnitude', steps),
+                'MagnitudeValue': self.__values.reshape(-1),
+                'MagnitudeUnits': self.__tile('MagnitudeUnits', steps)
+            }, index=numpy.tile(self.__columns['Position'].to_numpy(), steps))
+        return self.__dataframe
+
+    def to_csv(self, path: str):
+        self.to_dataframe().to_csv(path, sep=';', index=False)
+
+    def __tile(self, column: str, steps: int) -> pandas.Categorical:
+        metadata: pandas.Categorical = pandas.Categorical(self.__columns[column])
+        return pandas.Categorical.from_codes(numpy.tile(metadata.codes, steps), metadata.categories)
+
+    def __build_battery_data(self, battery: Battery) -> tuple:
+        steps: int = len(self.__clock)
+        battery_power: numpy.ndarray = battery.get_flowed_power_values(steps)
+        stored_energy: numpy.ndarray = battery.get_stored_energy_values(steps)
+        battery_state_of_charge: numpy.ndarray = (stored_energy / battery.get_nominal_energy().value) * 100
+        return [('battery', 'power', 'kW'), ('battery', 'state_of_charge', '%')], \
+            [battery_power, battery_state_of_charge]
+
+    def __build_photovoltaic_plate_data(self, pv: PhotovoltaicPlate) -> tuple:
+        #   The power of the plates is the generation that has been delivered, without the curtailed one.
+        pv_power: numpy.ndarray = numpy.array([pv.get_generation(step).value for step in self.__clock.get_steps()],
+                                              dtype=numpy.float64) - pv.get_curtailed_power_values(len(self.__clock))
+        return [('photovoltaic_plate', 'power', 'kW')], [pv_power]
+
+    def __build_point_of_grid_delivery_data(self, pod: PointOfGridDelivery) -> tuple:
+        pod_power: numpy.ndarray = pod.get_flowed_power_values(len(self.__clock))
+        return [('point_of_grid_delivery', 'power', 'kW')], [pod_power]
+
+    def __build_point_of_consumption(self, poc: PointOfConsumption) -> tuple:
+        poc_energy: numpy.ndarray = numpy.array(
+            [poc.get_consumption(step).value for step in self.__clock.get_steps()], dtype=numpy.float64)
+        return [('point_of_consumption', 'energy', 'kWh')], [poc_energy]
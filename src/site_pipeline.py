@@ -0,0 +1,152 @@
+import os
+import time
+import pandas
+from pandas import DataFrame
+
+from src.measurement import Measurement
+from src.parser import Parser
+from src.simulation_clock import SimulationClock
+from src.simulation_result import SimulationResult
+from src.input_cache import InputCache
+from src.cost_engine import CostEngine, CostBreakdown
+from src.history_reader import HistoryReader, TrainingHistory
+from src.machine_learning.knn_model import KNNModel
+from src.machine_learning.mesh_search import MeshSearch
+from src.entities.entities_manager import EntitiesManager
+from src.policies.standard_policy import StandardPolicy
+from src.policies.optimizer_policy import OptimizerPolicy
+
+#   Input files of a site, by the names of the columns of the fleet manifest.
+SITE_INPUTS: list = ['TechnicalCharacteristics', 'ConsumptionHistory', 'ContractedPowerHistory', 'MeteoHistory',
+                     'ContractedPowerData', 'MeteoData', 'Prices']
+#   Stages of the pipeline, whose times are recorded.
+STAGES: list = ['Training', 'Forecasting', 'Standard', 'Search', 'Optimized', 'Costing']
+
+
+class SitePipeline:
+
+    def __init__(self, inputs: dict, cache_path: str, sale_price: Measurement, search_workers: int = 1,
+                 n_jobs: int = -1):
+        #   The inputs are the paths of the files of the site, and the cache path keeps its parsed inputs and joined
+        #   history, as entries of the input cache, and its trained KNN model.
+        self.__inputs: dict = inputs
+        self.__parser: Parser = Parser()
+        self.__input_cache: InputCache = InputCache(cache_path)
+        self.__knn: KNNModel = KNNModel(os.path.join(cache_path, 'knn_model.pkl'), n_jobs=n_jobs)
+        self.__sale_price: Measurement = sale_price
+        self.__search_workers: int = search_workers
+        self.__times: dict = {stage: 0.0 for stage in STAGES}
+        self.__clock: SimulationClock = None
+        self.__technical_characteristics: DataFrame = None
+        self.__meteo_data: DataFrame = None
+        self.__contracted_power_data: DataFrame = None
+        self.__consumption_data: DataFrame = None
+        self.__filtered_purchase_prices: DataFrame = None
+        self.__entities_template: EntitiesManager = None
+        self.__cost_engine: CostEngine = None
+
+    def get_parser(self) -> Parser:
+        return self.__parser
+
+    def get_times(self) -> dict:
+        #   Seconds spent in every stage.
+        return self.__times
+
+    def get_clock(self) -> SimulationClock:
+        return self.__clock
+
+    def get_meteo_data(self) -> DataFrame:
+        return self.__meteo_data
+
+    def get_consumption_data(self) -> DataFrame:
+        return self.__consumption_data
+
+    def get_filtered_purchase_prices(self) -> DataFrame:
+        return self.__filtered_purchase_prices
+
+    def get_entities_template(self) -> EntitiesManager:
+        #   The entities with their input series, which every simulation clones.
+        return self.__entities_template
+
+    def train(self):
+        start: float = time.perf_counter()
+        #   Join the consumption, contracted power and meteorological histories by datetime, chunk by chunk, into
+        #   memory-mapped matrices, and train the KNN model with them.
+        training_history: TrainingHistory = HistoryReader(self.__parser, self.__input_cache).read(
+            self.__inputs['ConsumptionHistory'], self.__inputs['ContractedPowerHistory'],
+            self.__inputs['MeteoHistory'])
+        self.__knn.train(training_history.get_context_info(), training_history.get_consumption_history())
+        self.__times['Training'] += time.perf_counter() - start
+
+    def forecast(self):
+        start: float = time.perf_counter()
+        #   Predict the energy consumption with the contracted power and the meteorological info of the horizon.
+        self.__contracted_power_data = pandas.read_csv(self.__inputs['ContractedPowerData'], sep=';')
+        self.__meteo_data = self.__input_cache.load(self.__inputs['MeteoData'], self.__parser.read_meteo_info,
+                                                    'meteo')
+        context_info: DataFrame = self.__parser.build_context_info(self.__contracted_power_data, self.__meteo_data)
+        self.__consumption_data = self.__contracted_power_data.copy(deep=True)
+        self.__consumption_data['Magnitude'] = 'consumption'
+        self.__consumption_data['MagnitudeValue'] = self.__knn.predict(context_info)
+        self.__consumption_data['MagnitudeUnits'] = 'kWh'
+
+        #   Get the datetime range for the optimization.
+        initial_datetime: str = list(self.__consumption_data['InitialDatetime'])[0]
+        fake_final_datetime: str = list(self.__consumption_data['InitialDatetime'])[-1]
+        final_datetime: str = list(self.__consumption_data['InitialDatetime'])[-2]
+        self.__clock = SimulationClock(initial_datetime, final_datetime, 0.25)
+
+        #   Set the entities involved in the process, with the prices of the optimization dates range.
+        self.__technical_characteristics = pandas.read_csv(self.__inputs['TechnicalCharacteristics'], sep=';')
+        purchase_prices: DataFrame = self.__input_cache.read_csv(self.__inputs['Prices'], sep=';')
+        self.__filtered_purchase_prices = self.__parser.filter_dataframe(purchase_prices, initial_datetime,
+                                                                         fake_final_datetime)
+        self.__entities_template = EntitiesManager(self.__technical_characteristics)
+        self.__cost_engine = None
+        [pv.update_generation(self.__meteo_data) for pv in self.__entities_template.get_photovoltaic_plates()]
+        [pod.update_max_output_power(self.__contracted_power_data)
+         for pod in self.__entities_template.get_points_of_grid_delivery()]
+        [pod.update_purchase_prices(self.__filtered_purchase_prices)
+         for pod in self.__entities_template.get_points_of_grid_delivery()]
+        [pod.update_sale_price(self.__sale_price) for pod in self.__entities_template.get_points_of_grid_delivery()]
+        [poc.update_consumption(self.__consumption_data)
+         for poc in self.__entities_template.get_points_of_consumption()]
+        self.__times['Forecasting'] += time.perf_counter() - start
+
+    def simulate_standard(self) -> SimulationResult:
+        start: float = time.perf_counter()
+        entities_manager: EntitiesManager = self.__entities_template.clone()
+        StandardPolicy(entities_manager).simulate(self.__clock)
+        result: SimulationResult = SimulationResult(self.__clock, entities_manager.get_entities())
+        self.__times['Standard'] += time.perf_counter() - start
+        return result
+
+    def search(self) -> dict:
+        start: float = time.perf_counter()
+        optimized_coefficients: dict = MeshSearch(workers=self.__search_workers).search(
+            self.__technical_characteristics, self.__meteo_data, self.__contracted_power_data,
+            self.__filtered_purchase_prices, self.__sale_price, self.__consumption_data, self.__clock)
+        self.__times['Search'] += time.perf_counter() - start
+        return optimized_coefficients
+
+    def simulate_optimized(self, optimized_coefficients: dict) -> SimulationResult:
+        start: float = time.perf_counter()
+        entities_manager: EntitiesManager = self.__entities_template.clone()
+        OptimizerPolicy(optimized_coefficients, entities_manager).simulate(self.__clock)
+        result: SimulationResult = SimulationResult(self.__clock, entities_manager.get_entities())
+        self.__times['Optimized'] += time.perf_counter() - start
+        return result
+
+    def calculate_cost(self, result: SimulationResult) -> Measurement:
+        return Measurement(float(self.calculate_cost_breakdown(result).get_total()), '€')
+
+    def calculate_cost_breakdown(self, result: SimulationResult) -> CostBreakdown:
+        #   The cost only depends on the power flowed by the points of grid delivery of the result and on their
+        #   prices, which the template shares with every simulation, so the engine is built once per forecast.
+        start: float = time.perf_counter()
+        pods: list = self.__entities_template.get_points_of_grid_delivery()
+        if self.__cost_engine is None:
+            self.__cost_engine = CostEngine(self.__clock, pods)
+        cost_breakdown: CostBreakdown = self.__cost_engine.calculate(result.get_pods_power(pods))
+        self.__times['Costing'] += time.perf_counter() - start
+        return cost_breakdown
@@ -0,0 +1,61 @@
+import os
+import numpy
+import pandas
+import pytest
+from pandas import DataFrame
+
+from src.measurement import Measurement
+from src.parser import Parser
+from src.simulation_clock import SimulationClock
+from src.entities.entities_manager import EntitiesManager
+
+DATA_INPUT_PATH: str = os.path.join(os.path.dirname(__file__), os.path.pardir, 'data', 'input')
+
+
+def read_input(name: str) -> DataFrame:
+    return pandas.read_csv(os.path.join(DATA_INPUT_PATH, name), sep=';')
+
+
+def build_consumption_data(contracted_power_data: DataFrame, seed: int = 0) -> DataFrame:
+    #   A seeded consumption over the datetimes of the contracted power, so the simulations do not depend on the
+    #   KNN model and can be reproduced without training it.
+    consumption_data: DataFrame = contracted_power_data.copy(deep=True)
+    consumption_data['Magnitude'] = 'consumption'
+    consumption_data['MagnitudeValue'] = numpy.random.default_rng(seed).uniform(
+        20, 80, len(consumption_data)).round(1)
+    consumption_data['MagnitudeUnits'] = 'kWh'
+    return consumption_data
+
+
+class ShippedInputs:
+
+    def __init__(self):
+        parser: Parser = Parser()
+        self.__meteo_data: DataFrame = parser.read_meteo_info(os.path.join(DATA_INPUT_PATH, 'meteo_data.json'))
+        self.__contracted_power_data: DataFrame = read_input('contracted_power_data.csv')
+        self.__consumption_data: DataFrame = build_consumption_data(self.__contracted_power_data)
+        datetimes: list = list(self.__consumption_data['InitialDatetime'])
+        #   The last datetime only closes the horizon, as in the site pipeline.
+        self.__clock: SimulationClock = SimulationClock(datetimes[0], datetimes[-2], 0.25)
+        self.__purchase_prices: DataFrame = parser.filter_dataframe(read_input('prices.csv'), datetimes[0],
+                                                                    datetimes[-1])
+        self.__technical_characteristics: DataFrame = read_input('technical_characteristics.csv')
+        self.__sale_price: Measurement = Measurement(0.13, '€/kWh')
+
+    def get_clock(self) -> SimulationClock:
+        return self.__clock
+
+    def build_entities_manager(self) -> EntitiesManager:
+        entities_manager: EntitiesManager = EntitiesManager(self.__technical_characteristics)
+        [pv.update_generation(self.__meteo_data) for pv in entities_manager.get_photovoltaic_plates()]
+        [pod.update_max_output_power(self.__contracted_power_data)
+         for pod in entities_manager.get_points_of_grid_delivery()]
+        [pod.update_purchase_prices(self.__purchase_prices) for pod in entities_manager.get_points_of_grid_delivery()]
+        [pod.update_sale_price(self.__sale_price) for pod in entities_manager.get_points_of_grid_delivery()]
+        [poc.update_consumption(self.__consumption_data) for poc in entities_manager.get_points_of_consumption()]
+        return entities_manager
+
+
+@pytest.fixture(scope='session')
+def shipped_inputs() -> ShippedInputs:
+    return ShippedInputs()
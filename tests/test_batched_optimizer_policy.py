@@ -0,0 +1,62 @@
+import itertools
+import numpy
+import pytest
+
+from src.simulation_clock import SimulationClock
+from src.simulation_result import SimulationResult
+from src.cost_engine import CostEngine
+from src.entities.entities_manager import EntitiesManager
+from src.policies.optimizer_policy import OptimizerPolicy
+from src.policies.batched_optimizer_policy import BatchedOptimizerPolicy, COEFFICIENTS, build_coefficients_matrix
+
+CANDIDATES: list = [dict(zip(COEFFICIENTS, values)) for values in [
+    (0.4, 0.55, 0.4, 0.45, 0.4), (0.5, 0.5, 0.5, 0.5, 0.5), (0.6, 0.4, 0.6, 0.6, 0.6), (0.45, 0.6, 0.55, 0.4, 0.5)]]
+
+
+def calculate_optimizer_cost(shipped_inputs, coefficients: dict) -> float:
+    clock: SimulationClock = shipped_inputs.get_clock()
+    entities_manager: EntitiesManager = shipped_inputs.build_entities_manager()
+    OptimizerPolicy(coefficients, entities_manager).simulate(clock)
+    pods: list = entities_manager.get_points_of_grid_delivery()
+    return float(CostEngine(clock, pods).calculate(
+        SimulationResult(clock, entities_manager.get_entities()).get_pods_power(pods)).get_total())
+
+
+def test_build_coefficients_matrix_sorts_the_columns():
+    matrix: numpy.ndarray = build_coefficients_matrix(CANDIDATES)
+    assert matrix.shape == (len(CANDIDATES), len(COEFFICIENTS))
+    numpy.testing.assert_array_equal(matrix[0], [0.4, 0.55, 0.4, 0.45, 0.4])
+
+
+def test_batched_costs_match_the_optimizer_policy(shipped_inputs):
+    policy: BatchedOptimizerPolicy = BatchedOptimizerPolicy(build_coefficients_matrix(CANDIDATES),
+                                                            shipped_inputs.build_entities_manager())
+    policy.simulate(shipped_inputs.get_clock())
+    expected: list = [calculate_optimizer_cost(shipped_inputs, coefficients) for coefficients in CANDIDATES]
+    numpy.testing.assert_allclose(policy.get_costs(), expected, rtol=1e-9)
+
+
+def test_batched_costs_match_the_optimizer_policy_on_a_grid(shipped_inputs):
+    #   Every combination of two values per coefficient, so each driver of the table is crossed at both sides.
+    candidates: list = [dict(zip(COEFFICIENTS, values)) for values in itertools.product([0.4, 0.6], repeat=5)]
+    policy: BatchedOptimizerPolicy = BatchedOptimizerPolicy(build_coefficients_matrix(candidates),
+                                                            shipped_inputs.build_entities_manager())
+    policy.simulate(shipped_inputs.get_clock())
+    expected: list = [calculate_optimizer_cost(shipped_inputs, coefficients) for coefficients in candidates]
+    numpy.testing.assert_allclose(policy.get_costs(), expected, rtol=1e-9)
+
+
+def test_batched_policy_leaves_the_entities_untouched(shipped_inputs):
+    entities_manager: EntitiesManager = shipped_inputs.build_entities_manager()
+    energy: numpy.ndarray = entities_manager.get_battery_fleet().get_energy().copy()
+    BatchedOptimizerPolicy(build_coefficients_matrix(CANDIDATES), entities_manager).simulate(
+        shipped_inputs.get_clock())
+    numpy.testing.assert_array_equal(entities_manager.get_battery_fleet().get_energy(), energy)
+
+
+@pytest.mark.parametrize('coefficients', CANDIDATES)
+def test_single_candidate_matches_the_optimizer_policy(shipped_inputs, coefficients: dict):
+    policy: BatchedOptimizerPolicy = BatchedOptimizerPolicy(build_coefficients_matrix([coefficients]),
+                                                            shipped_inputs.build_entities_manager())
+    policy.simulate(shipped_inputs.get_clock())
+    assert policy.get_costs()[0] == pytest.approx(calculate_optimizer_cost(shipped_inputs, coefficients), rel=1e-9)
@@ -0,0 +1,50 @@
+import numpy
+
+from src.machine_learning.decision_cache import DecisionCache
+
+FEATURES: numpy.ndarray = numpy.array([[0.1, 1.0], [0.5, 2.0], [0.3, 2.0], [0.5, 3.0]])
+
+
+def test_signatures_are_the_positions_among_the_sorted_features():
+    cache: DecisionCache = DecisionCache(FEATURES)
+    assert cache.get_signatures(numpy.array([[0.0, 0.5], [0.2, 2.0], [0.6, 3.5]])) == [(0, 0), (1, 1), (3, 3)]
+
+
+def test_coefficients_between_the_same_features_share_the_signature():
+    cache: DecisionCache = DecisionCache(FEATURES)
+    signatures: list = cache.get_signatures(numpy.array([[0.31, 1.5], [0.49, 1.99], [0.5, 2.0], [0.51, 2.01]]))
+    #   The policies compare whether a feature is below the coefficient, so a coefficient equal to a feature takes
+    #   the same decisions as the ones just below it.
+    assert signatures[0] == signatures[1] == signatures[2]
+    assert signatures[2] != signatures[3]
+
+
+def test_single_coefficients_row():
+    cache: DecisionCache = DecisionCache(FEATURES)
+    assert cache.get_signatures(numpy.array([0.2, 2.5])) == [(1, 2)]
+
+
+def test_evaluate_simulates_each_signature_once():
+    cache: DecisionCache = DecisionCache(FEATURES)
+    evaluated: list = []
+
+    def evaluate(coefficients: numpy.ndarray) -> numpy.ndarray:
+        evaluated.append(coefficients.copy())
+        return coefficients.sum(axis=1)
+
+    costs: numpy.ndarray = cache.evaluate(numpy.array([[0.2, 1.5], [0.25, 1.8], [0.4, 2.5]]), evaluate)
+    assert len(evaluated) == 1
+    numpy.testing.assert_array_equal(evaluated[0], [[0.2, 1.5], [0.4, 2.5]])
+    #   The second candidate reuses the cost of the first one, which has the same signature.
+    numpy.testing.assert_allclose(costs, [1.7, 1.7, 2.9])
+    assert (cache.get_misses(), cache.get_hits(), len(cache)) == (2, 1, 2)
+
+    costs = cache.evaluate(numpy.array([[0.21, 1.6]]), evaluate)
+    assert len(evaluated) == 1
+    numpy.testing.assert_allclose(costs, [1.7])
+    assert (cache.get_misses(), cache.get_hits()) == (2, 2)
+    assert cache.get_hit_rate() == 0.5
+
+
+def test_empty_cache_hit_rate():
+    assert DecisionCache(FEATURES).get_hit_rate() == 0.0
@@ -0,0 +1,52 @@
+import os
+import json
+import pytest
+
+from src.json_stream import iterate_values
+
+DATA_INPUT_PATH: str = os.path.join(os.path.dirname(__file__), os.path.pardir, 'data', 'input')
+
+
+def flatten(value, keys: tuple = ()):
+    #   The scalars of a decoded JSON document with the path of their keys, the items of an array sharing the path of
+    #   their array, as the stream yields them.
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, keys + (key,))
+    elif isinstance(value, list):
+        for item in value:
+            yield from flatten(item, keys)
+    else:
+        yield keys, value
+
+
+def write(tmp_path, content: str) -> str:
+    path: str = os.path.join(tmp_path, 'data.json')
+    with open(path, 'w', encoding='utf-8') as file:
+        file.write(content)
+    return path
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64, 1 << 20])
+def test_values_match_json_loads(tmp_path, chunk_size: int):
+    content: str = json.dumps({
+        'name': 'meteo \"site\" \\ é', 'empty': {}, 'nothing': [], 'flags': [True, False, None],
+        'hourly': {'time': ['2023-06-05T00:00', '2023-06-05T01:00'], 'temperature_2m': [12.5, -3, 1e-3, 2.5E+2],
+                   'nested': [[1, 2], [3, {'deep': 4}]]},
+        'units': {'temperature_2m': '°C'}, 'count': 12345678901234567890})
+    path: str = write(tmp_path, content)
+    assert list(iterate_values(path, chunk_size)) == list(flatten(json.loads(content)))
+
+
+@pytest.mark.parametrize('chunk_size', [5, 1 << 20])
+def test_shipped_meteo_matches_json_loads(chunk_size: int):
+    path: str = os.path.join(DATA_INPUT_PATH, 'meteo_data.json')
+    with open(path, encoding='utf-8') as file:
+        expected: list = list(flatten(json.load(file)))
+    assert list(iterate_values(path, chunk_size)) == expected
+
+
+@pytest.mark.parametrize('content', ['{"a": [1, 2}', '{"a": 1', '{"a": 1x}', '{"a": @}'])
+def test_invalid_content_raises(tmp_path, content: str):
+    with pytest.raises(ValueError):
+        list(iterate_values(write(tmp_path, content), 4))
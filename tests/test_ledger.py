@@ -0,0 +1,81 @@
+import numpy
+
+from src.entities.ledger import Ledger
+
+
+def test_accumulate_sums_the_values_of_a_step():
+    ledger: Ledger = Ledger('power', 'kW', capacity=4)
+    ledger.accumulate(1, 2.0)
+    ledger.accumulate(1, 3.5)
+    assert ledger.get_value(1) == 5.5
+    assert ledger.get_last_value() == 5.5
+    assert ledger.is_recorded(1) and not ledger.is_recorded(0)
+    assert len(ledger) == 1
+
+
+def test_empty_ledger():
+    ledger: Ledger = Ledger('power', 'kW', capacity=2)
+    assert len(ledger) == 0
+    assert ledger.get_last_value() == 0.0
+    assert ledger.get_value(10) == 0.0
+    assert not ledger.is_recorded(10)
+
+
+def test_arrays_grow_beyond_the_capacity():
+    ledger: Ledger = Ledger('energy', 'kWh', capacity=2)
+    for step in range(9):
+        ledger.accumulate(step, float(step))
+    assert len(ledger.get_values()) >= 9
+    numpy.testing.assert_array_equal(ledger.get_values(9), numpy.arange(9.0))
+    assert ledger.get_last_value() == 8.0
+    assert len(ledger) == 9
+
+
+def test_growth_keeps_the_recorded_steps():
+    ledger: Ledger = Ledger('energy', 'kWh', capacity=2)
+    ledger.accumulate(0, 1.0)
+    ledger.accumulate(20, 2.0)
+    assert ledger.is_recorded(0) and ledger.is_recorded(20) and not ledger.is_recorded(10)
+    assert ledger.get_value(0) == 1.0 and ledger.get_value(20) == 2.0
+    assert len(ledger) == 2
+
+
+def test_reserve_does_not_shrink():
+    ledger: Ledger = Ledger('energy', 'kWh', capacity=8)
+    ledger.accumulate(5, 1.0)
+    ledger.reserve(4)
+    assert len(ledger.get_values()) == 8
+    ledger.reserve(16)
+    assert len(ledger.get_values()) == 16
+    assert ledger.get_value(5) == 1.0
+
+
+def test_get_values_pads_the_steps_not_recorded():
+    ledger: Ledger = Ledger('energy', 'kWh', capacity=2)
+    ledger.accumulate(1, 4.0)
+    numpy.testing.assert_array_equal(ledger.get_values(5), [0.0, 4.0, 0.0, 0.0, 0.0])
+    numpy.testing.assert_array_equal(ledger.get_values(1), [0.0])
+
+
+def test_to_dataframe_keeps_the_recorded_steps():
+    ledger: Ledger = Ledger('power', 'kW', capacity=2)
+    ledger.accumulate(0, 1.0)
+    ledger.accumulate(2, 3.0)
+    ledger.accumulate(2, -0.5)
+    initial_datetimes: list = ['2023-06-05 00:00:00', '2023-06-05 00:15:00', '2023-06-05 00:30:00']
+    final_datetimes: list = ['2023-06-05 00:15:00', '2023-06-05 00:30:00', '2023-06-05 00:45:00']
+    dataframe = ledger.to_dataframe(initial_datetimes, final_datetimes)
+    assert list(dataframe.columns) == ['InitialDatetime', 'FinalDatetime', 'Magnitude', 'MagnitudeValue',
+                                       'MagnitudeUnits']
+    assert list(dataframe['InitialDatetime']) == ['2023-06-05 00:00:00', '2023-06-05 00:30:00']
+    assert list(dataframe['FinalDatetime']) == ['2023-06-05 00:15:00', '2023-06-05 00:45:00']
+    assert list(dataframe['Magnitude']) == ['power', 'power']
+    assert list(dataframe['MagnitudeValue']) == [1.0, 2.5]
+    assert list(dataframe['MagnitudeUnits']) == ['kW', 'kW']
+
+
+def test_to_dataframe_of_an_empty_ledger():
+    dataframe = Ledger('power', 'kW').to_dataframe([], [])
+    assert dataframe.empty
+    assert list(dataframe.columns) == ['InitialDatetime', 'FinalDatetime', 'Magnitude', 'MagnitudeValue',
+                                       'MagnitudeUnits']
@@ -0,0 +1,37 @@
+import pytest
+
+from src.simulation_clock import SimulationClock
+from src.simulation_result import SimulationResult
+from src.cost_engine import CostEngine
+from src.entities.entities_manager import EntitiesManager
+from src.policies.policy import Policy
+from src.policies.standard_policy import StandardPolicy
+from src.policies.optimizer_policy import OptimizerPolicy
+from src.policies.batched_optimizer_policy import COEFFICIENTS
+
+#   Costs of the policies on the shipped inputs with the seeded consumption of the fixture. The standard cost was
+#   807.9366687500001 before the water-filling allocators, which charge the batteries with the share of the full ones.
+OPTIMIZER_COSTS: list = [((0.4, 0.55, 0.4, 0.45, 0.4), 909.91386875), ((0.5, 0.5, 0.5, 0.5, 0.5), 984.8625125),
+                         ((0.6, 0.4, 0.6, 0.6, 0.6), 988.6043375), ((0.45, 0.6, 0.55, 0.4, 0.5), 888.4844)]
+
+
+def calculate_cost(shipped_inputs, build_policy) -> float:
+    clock: SimulationClock = shipped_inputs.get_clock()
+    entities_manager: EntitiesManager = shipped_inputs.build_entities_manager()
+    policy: Policy = build_policy(entities_manager)
+    policy.simulate(clock)
+    pods: list = entities_manager.get_points_of_grid_delivery()
+    return float(CostEngine(clock, pods).calculate(
+        SimulationResult(clock, entities_manager.get_entities()).get_pods_power(pods)).get_total())
+
+
+def test_standard_policy_cost(shipped_inputs):
+    assert calculate_cost(shipped_inputs, StandardPolicy) == pytest.approx(729.82235, rel=1e-9)
+
+
+@pytest.mark.parametrize('values, cost', OPTIMIZER_COSTS)
+def test_optimizer_policy_cost(shipped_inputs, values: tuple, cost: float):
+    coefficients: dict = dict(zip(COEFFICIENTS, values))
+    optimizer_cost: float = calculate_cost(
+        shipped_inputs, lambda entities_manager: OptimizerPolicy(coefficients, entities_manager))
+    assert optimizer_cost == pytest.approx(cost, rel=1e-9)
@@ -0,0 +1,71 @@
+import numpy
+import pytest
+
+from src.policies.water_filling import water_filling
+
+
+def test_equal_share_when_no_unit_is_full():
+    allocations, total = water_filling(numpy.array([10.0, 10.0, 10.0]), 9.0)
+    numpy.testing.assert_allclose(allocations, [3.0, 3.0, 3.0])
+    assert total == pytest.approx(9.0)
+
+
+def test_share_of_full_units_is_spread_over_the_rest():
+    allocations, total = water_filling(numpy.array([1.0, 10.0, 4.0]), 9.0)
+    numpy.testing.assert_allclose(allocations, [1.0, 4.0, 4.0])
+    assert total == pytest.approx(9.0)
+
+
+def test_every_unit_is_full_when_the_power_exceeds_the_capacities():
+    allocations, total = water_filling(numpy.array([1.0, 2.0, 3.0]), 10.0)
+    numpy.testing.assert_allclose(allocations, [1.0, 2.0, 3.0])
+    assert total == pytest.approx(6.0)
+
+
+def test_negative_power_is_not_allocated():
+    allocations, total = water_filling(numpy.array([1.0, 2.0]), -5.0)
+    numpy.testing.assert_allclose(allocations, [0.0, 0.0])
+    assert total == 0.0
+
+
+def test_units_without_capacity_receive_nothing():
+    allocations, total = water_filling(numpy.array([0.0, 5.0, 0.0]), 3.0)
+    numpy.testing.assert_allclose(allocations, [0.0, 3.0, 0.0])
+    assert total == pytest.approx(3.0)
+
+
+def test_no_units():
+    allocations, total = water_filling(numpy.zeros((2, 0)), numpy.array([1.0, 2.0]))
+    assert allocations.shape == (2, 0)
+    numpy.testing.assert_array_equal(total, [0.0, 0.0])
+
+
+def test_leading_axes_match_the_single_problems():
+    rng: numpy.random.Generator = numpy.random.default_rng(0)
+    capacities: numpy.ndarray = rng.uniform(0.0, 10.0, (4, 5, 3))
+    power: numpy.ndarray = rng.uniform(-5.0, 40.0, (4, 5))
+    allocations, total = water_filling(capacities, power)
+    for index in numpy.ndindex(power.shape):
+        single_allocations, single_total = water_filling(capacities[index], power[index])
+        numpy.testing.assert_allclose(allocations[index], single_allocations)
+        assert total[index] == pytest.approx(single_total)
+
+
+def test_allocations_match_the_iterative_sharing():
+    #   The iterative sharing of the scalar policies: the power is shared equally among the units that are not full
+    #   until it is all allocated or every unit is full.
+    rng: numpy.random.Generator = numpy.random.default_rng(1)
+    for _ in range(200):
+        capacities: numpy.ndarray = rng.uniform(0.0, 10.0, rng.integers(1, 6))
+        power: float = float(rng.uniform(0.0, 40.0))
+        expected: numpy.ndarray = numpy.zeros(len(capacities))
+        remaining: float = power
+        while remaining > 1e-12 and numpy.any(expected < capacities):
+            open_units: numpy.ndarray = expected < capacities
+            share: float = remaining / numpy.count_nonzero(open_units)
+            added: numpy.ndarray = numpy.where(open_units, numpy.minimum(capacities - expected, share), 0.0)
+            expected += added
+            remaining -= added.sum()
+        allocations, total = water_filling(capacities, power)
+        numpy.testing.assert_allclose(allocations, expected, atol=1e-9)
+        assert total == pytest.approx(min(power, capacities.sum()))